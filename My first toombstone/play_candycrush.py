@@ -1,5 +1,6 @@
 from src.tournament import TournamentManager
 import argparse
+import os
 from src.tournament import TournamentManager
 
 def main():
@@ -19,6 +20,10 @@ def main():
                       help='File containing predefined boards')
     parser.add_argument('--out', type=str, default='results/summary.csv',
                       help='Output CSV file path (default: results/summary.csv)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                      help='Number of worker processes (default: number of CPUs)')
+    parser.add_argument('--seed', type=int,
+                      help='Base seed for reproducible tournaments (default: random)')
     
     args = parser.parse_args()
     
@@ -29,7 +34,9 @@ def main():
         cols=args.cols,
         target=args.target,
         input_predefined=args.input_predefined,
-        input_file=args.input_file
+        input_file=args.input_file,
+        workers=args.workers,
+        base_seed=args.seed
     )
     
     tournament.run_tournament()
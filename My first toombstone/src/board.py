@@ -1,6 +1,8 @@
+import heapq
 import numpy as np
-from typing import List, Tuple, Set, Optional
+from typing import List, Tuple, Optional
 from enum import IntEnum
+from numba import njit
 
 class Color(IntEnum):
     EMPTY = 0
@@ -9,23 +11,252 @@ class Color(IntEnum):
     GREEN = 3
     BLUE = 4
 
+# Line score indexed by run length (runs longer than 5 score as a line of 5)
+_SCORE_LUT = np.array([0, 0, 0, 5, 10, 50])
+
+def _find_runs(grid: np.ndarray) -> Tuple[List[int], List[int], List[int]]:
+    """Return (row, start, length) of every non-empty horizontal run of 3 or more, row-major."""
+    rows, cols = grid.shape
+    boundaries = np.ones((rows, cols + 1), dtype=bool)
+    boundaries[:, 1:-1] = grid[:, 1:] != grid[:, :-1]
+    bound_rows, bound_cols = np.nonzero(boundaries)
+    # Consecutive boundaries on the same row delimit one run
+    same_row = bound_rows[1:] == bound_rows[:-1]
+    run_rows = bound_rows[:-1][same_row]
+    starts = bound_cols[:-1][same_row]
+    lengths = np.diff(bound_cols)[same_row]
+    keep = (lengths >= 3) & (grid[run_rows, starts] != Color.EMPTY)
+    return run_rows[keep].tolist(), starts[keep].tolist(), lengths[keep].tolist()
+
+# Relative (dr, dc) offsets of the 5 cells of each L orientation, anchored at (0, 0)
+_L_OFFSETS = np.array([
+    [(0, 0), (1, 0), (2, 0), (2, -1), (2, -2)],    # stem down, foot left
+    [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2)],      # stem down, foot right
+    [(0, 0), (-1, 0), (-2, 0), (0, -1), (0, -2)],  # stem up, foot left
+    [(0, 0), (0, 1), (0, 2), (-1, 2), (-2, 2)],    # stem up two columns right, foot left
+], dtype=np.int8)
+
+# Same for T, anchored at the centre: 0=stem up, 1=stem down, 2=stem right, 3=stem left
+_T_OFFSETS = np.array([
+    [(0, 0), (-1, 0), (-2, 0), (0, -1), (0, 1)],
+    [(0, 0), (1, 0), (2, 0), (0, -1), (0, 1)],
+    [(0, 0), (0, 1), (0, 2), (-1, 0), (1, 0)],
+    [(0, 0), (0, -1), (0, -2), (-1, 0), (1, 0)],
+], dtype=np.int8)
+
+@njit(cache=True, boundscheck=False)
+def _find_lt(grid, offsets, margin_lo, margin_hi, score):
+    """Scan every anchor in [margin_lo, size - margin_hi) for the shapes in offsets.
+
+    Returns an int16 array with one row per hit: (score, r0, c0, ..., r4, c4).
+    Hits are in (row, col, orientation) order and may repeat the same cells.
+    """
+    rows, cols = grid.shape
+    n_ori, n_cells = offsets.shape[0], offsets.shape[1]
+    out = np.empty((max(rows * cols * n_ori, 1), 1 + 2 * n_cells), dtype=np.int16)
+    n = 0
+    for r in range(margin_lo, rows - margin_hi):
+        for c in range(margin_lo, cols - margin_hi):
+            color = grid[r, c]
+            if color == 0:
+                continue
+            for ori in range(n_ori):
+                valid = True
+                for k in range(n_cells):
+                    rr = r + offsets[ori, k, 0]
+                    cc = c + offsets[ori, k, 1]
+                    if rr < 0 or rr >= rows or cc < 0 or cc >= cols or grid[rr, cc] != color:
+                        valid = False
+                        break
+                if not valid:
+                    continue
+                out[n, 0] = score
+                for k in range(n_cells):
+                    out[n, 1 + 2 * k] = r + offsets[ori, k, 0]
+                    out[n, 2 + 2 * k] = c + offsets[ori, k, 1]
+                n += 1
+    return out[:n]
+
+# Every L (3+3) whose 3x3 box has a corner at (0, 0), as checked by Board._check_L_at:
+# shape (16, 5, 2) of (dr, dc) offsets relative to the cell being tested
+_L_AROUND = np.array([
+    shape
+    for dr, dc in ((-2, -2), (-2, 0), (0, -2), (0, 0))
+    for shape in (
+        [(dr + i, dc) for i in range(3)] + [(dr + 2, dc + j) for j in (1, 2)],
+        [(dr + i, dc + 2) for i in range(3)] + [(dr + 2, dc + 2 - j) for j in (1, 2)],
+        [(dr + 2 - i, dc) for i in range(3)] + [(dr, dc + j) for j in (1, 2)],
+        [(dr + 2 - i, dc + 2) for i in range(3)] + [(dr, dc + 2 - j) for j in (1, 2)],
+    )
+], dtype=np.int8)
+
+@njit(cache=True, inline='always')
+def _getc(grid, row, col, r1, c1, r2, c2):
+    """grid[row, col] as it would read with (r1, c1) and (r2, c2) swapped."""
+    if row == r1 and col == c1:
+        return grid[r2, c2]
+    if row == r2 and col == c2:
+        return grid[r1, c1]
+    return grid[row, col]
+
+@njit(cache=True, inline='always')
+def _shape_at(grid, row, col, color, offsets, ori, r1, c1, r2, c2):
+    rows, cols = grid.shape
+    for k in range(offsets.shape[1]):
+        r = row + offsets[ori, k, 0]
+        c = col + offsets[ori, k, 1]
+        if r < 0 or r >= rows or c < 0 or c >= cols or _getc(grid, r, c, r1, c1, r2, c2) != color:
+            return False
+    return True
+
+@njit(cache=True, boundscheck=False)
+def _hit_at(grid, row, col, r1, c1, r2, c2, l_offsets, t_offsets):
+    rows, cols = grid.shape
+    color = _getc(grid, row, col, r1, c1, r2, c2)
+    if color == 0:
+        return False
+    # Lines of 3 or more through (row, col)
+    length = 1
+    c = col - 1
+    while c >= 0 and _getc(grid, row, c, r1, c1, r2, c2) == color:
+        length += 1
+        c -= 1
+    c = col + 1
+    while c < cols and _getc(grid, row, c, r1, c1, r2, c2) == color:
+        length += 1
+        c += 1
+    if length >= 3:
+        return True
+    length = 1
+    r = row - 1
+    while r >= 0 and _getc(grid, r, col, r1, c1, r2, c2) == color:
+        length += 1
+        r -= 1
+    r = row + 1
+    while r < rows and _getc(grid, r, col, r1, c1, r2, c2) == color:
+        length += 1
+        r += 1
+    if length >= 3:
+        return True
+    # L shapes of this cell's colour in the surrounding 3x3 boxes
+    for ori in range(l_offsets.shape[0]):
+        if _shape_at(grid, row, col, color, l_offsets, ori, r1, c1, r2, c2):
+            return True
+    # T shapes of any colour centred in the 3x3 neighbourhood
+    for r in range(row - 1, row + 2):
+        for c in range(col - 1, col + 2):
+            if r < 0 or r >= rows or c < 0 or c >= cols:
+                continue
+            center_color = _getc(grid, r, c, r1, c1, r2, c2)
+            if center_color == 0:
+                continue
+            for ori in range(t_offsets.shape[0]):
+                if _shape_at(grid, r, c, center_color, t_offsets, ori, r1, c1, r2, c2):
+                    return True
+    return False
+
+@njit(cache=True, boundscheck=False)
+def _local_hit_readonly(grid, r1, c1, r2, c2, l_offsets, t_offsets):
+    """Whether swapping (r1, c1) and (r2, c2) would put either cell in a formation.
+
+    The swap is only simulated on reads; grid is never written.
+    """
+    return (_hit_at(grid, r1, c1, r1, c1, r2, c2, l_offsets, t_offsets)
+            or _hit_at(grid, r2, c2, r1, c1, r2, c2, l_offsets, t_offsets))
+
+def warm_up_kernels() -> None:
+    """Compile every Numba kernel for uint8 grids, or load it from the on-disk cache.
+
+    Call once in a parent process before spawning workers, so the kernels are
+    compiled and cached a single time instead of once per worker.
+    """
+    grid = np.zeros((3, 3), dtype=np.uint8)
+    _find_lt(grid, _L_OFFSETS, 0, 2, 20)
+    _find_lt(grid, _T_OFFSETS, 1, 1, 30)
+    _local_hit_readonly(grid, 0, 0, 0, 1, _L_AROUND, _T_OFFSETS)
+
+def _nibble_run(word: int, pos: int, ones: int, size: int) -> Tuple[int, int]:
+    """SWAR (start, length) of the run through nibble pos of a line packed 4 bits per cell.
+
+    The length is 0 if the cell is empty.
+    """
+    color = (word >> (4 * pos)) & 0xF
+    if color == 0:
+        return pos, 0
+    x = word ^ (color * ones)
+    # One flag bit at the base of every nibble that differs, plus a sentinel past the end
+    diff = ((x | (x >> 1) | (x >> 2) | (x >> 3)) & ones) | (1 << (4 * size))
+    right = diff >> (4 * pos + 4)
+    left = diff & ((1 << (4 * pos)) - 1)
+    # The run starts just after the nearest differing nibble on the left, if any
+    start = (left.bit_length() - 1) // 4 + 1
+    end = pos + 1 + ((right & -right).bit_length() - 1) // 4
+    return start, end - start
+
 class Formation:
-    def __init__(self, cells: Set[Tuple[int, int]], score: int):
+    __slots__ = ('cells', 'score')
+    
+    def __init__(self, cells: np.ndarray, score: int):
+        # Flat int16 cell indices (row * cols + col) into the board grid
         self.cells = cells
         self.score = score
 
 class Board:
-    def __init__(self, rows: int = 11, cols: int = 11, predefined: Optional[np.ndarray] = None):
+    __slots__ = ('rows', 'cols', 'grid', '_rng', '_row_bits', '_col_bits', '_row_ones', '_col_ones',
+                 '_bits_stale')
+    
+    def __init__(self, rows: int = 11, cols: int = 11, predefined: Optional[np.ndarray] = None,
+                 rng: Optional[np.random.Generator] = None):
         self.rows = rows
         self.cols = cols
+        self._rng = rng if rng is not None else np.random.default_rng()
+        # The grid is always a private, C-contiguous uint8 array of Color values
+        # (0..4, so every cell also fits the 4-bit packing used by _row_bits/_col_bits)
         if predefined is not None:
-            self.grid = predefined.copy()
+            self.grid = np.array(predefined, dtype=np.uint8, order='C')
         else:
-            self.grid = np.random.randint(1, 5, size=(rows, cols), dtype=np.int8)
+            self.grid = self._rng.integers(1, 5, size=(rows, cols), dtype=np.uint8)
+        # Rows and columns packed 4 bits per cell, for SWAR run-length checks.
+        # They are repacked lazily, on the next run-length check after a bulk
+        # grid write. Code that writes self.grid directly must set _bits_stale
+        # (or call _sync_bits()), or the packed lines no longer match the grid
+        self._row_bits: Optional[List[int]] = None
+        self._col_bits: Optional[List[int]] = None
+        self._bits_stale = True
+    
+    def _sync_bits(self) -> None:
+        """Repack _row_bits/_col_bits from the grid (lines longer than 16 cells are not packed)."""
+        self._bits_stale = False
+        rows, cols = self.grid.shape
+        if rows > 16 or cols > 16:
+            return
+        cells = self.grid.astype(np.uint64)
+        self._row_bits = np.bitwise_or.reduce(cells << (4 * np.arange(cols, dtype=np.uint64)), axis=1).tolist()
+        self._col_bits = np.bitwise_or.reduce(cells.T << (4 * np.arange(rows, dtype=np.uint64)), axis=1).tolist()
+        self._row_ones = int('1' * cols, 16)
+        self._col_ones = int('1' * rows, 16)
+    
+    def _swap_cells(self, r1: int, c1: int, r2: int, c2: int) -> None:
+        grid = self.grid
+        v1 = int(grid[r1, c1])
+        v2 = int(grid[r2, c2])
+        grid[r1, c1] = v2
+        grid[r2, c2] = v1
+        # Stale packed lines are rebuilt from the grid anyway
+        if self._row_bits is not None and not self._bits_stale:
+            delta = v1 ^ v2
+            self._row_bits[r1] ^= delta << (4 * c1)
+            self._row_bits[r2] ^= delta << (4 * c2)
+            self._col_bits[c1] ^= delta << (4 * r1)
+            self._col_bits[c2] ^= delta << (4 * r2)
     
     def is_valid_position(self, row: int, col: int) -> bool:
         return 0 <= row < self.rows and 0 <= col < self.cols
     
+    def _c(self, row: int, col: int) -> int:
+        """Raw colour value at (row, col), 0 when off the board; avoids building a Color."""
+        return self.grid.item(row, col) if 0 <= row < self.rows and 0 <= col < self.cols else 0
+    
     def get_color(self, row: int, col: int) -> Color:
         if not self.is_valid_position(row, col):
             return Color.EMPTY
@@ -33,244 +264,105 @@ class Board:
     
     def find_line_formations(self) -> List[Formation]:
         formations = []
-        # Check horizontal lines
-        for row in range(self.rows):
-            count = 1
-            current_color = self.get_color(row, 0)
-            cells = {(row, 0)}
-            
-            for col in range(1, self.cols):
-                color = self.get_color(row, col)
-                if color == current_color and color != Color.EMPTY:
-                    count += 1
-                    cells.add((row, col))
-                else:
-                    if count >= 3:
-                        score = 5 if count == 3 else (10 if count == 4 else 50)
-                        formations.append(Formation(cells, score))
-                    count = 1
-                    cells = {(row, col)}
-                    current_color = color
-                    
-            if count >= 3 and current_color != Color.EMPTY:
-                score = 5 if count == 3 else (10 if count == 4 else 50)
-                formations.append(Formation(cells, score))
-        
-        # Check vertical lines
-        for col in range(self.cols):
-            count = 1
-            current_color = self.get_color(0, col)
-            cells = {(0, col)}
-            
-            for row in range(1, self.rows):
-                color = self.get_color(row, col)
-                if color == current_color and color != Color.EMPTY:
-                    count += 1
-                    cells.add((row, col))
-                else:
-                    if count >= 3:
-                        score = 5 if count == 3 else (10 if count == 4 else 50)
-                        formations.append(Formation(cells, score))
-                    count = 1
-                    cells = {(row, col)}
-                    current_color = color
-                    
-            if count >= 3 and current_color != Color.EMPTY:
-                score = 5 if count == 3 else (10 if count == 4 else 50)
-                formations.append(Formation(cells, score))
+        cols = self.grid.shape[1]
+        # Horizontal lines, then vertical lines (the same scan on the transposed grid)
+        for lines, vertical in ((self.grid, False), (self.grid.T, True)):
+            for line, start, length in zip(*_find_runs(lines)):
+                run = np.arange(start, start + length, dtype=np.int16)
+                cells = run * cols + line if vertical else line * cols + run
+                formations.append(Formation(cells, int(_SCORE_LUT[min(length, 5)])))
         
         return formations
     
+    def _lt_formations(self, offsets: np.ndarray, margin_lo: int, margin_hi: int, score: int) -> List[Formation]:
+        hits = _find_lt(self.grid, offsets, margin_lo, margin_hi, score)
+        if not len(hits):
+            return []
+        cells = np.sort(hits[:, 1::2] * self.grid.shape[1] + hits[:, 2::2], axis=1)
+        # Only keep the first hit for each distinct set of cells, in scan order
+        _, first = np.unique(cells, axis=0, return_index=True)
+        return [Formation(cells[i], score) for i in np.sort(first)]
+    
     def find_l_formations(self) -> List[Formation]:
-        formations = []
-        for row in range(self.rows - 2):
-            for col in range(self.cols - 2):
-                # Check L pattern in 4 orientations
-                for orientation in range(4):
-                    # Calculate orientation-specific offsets
-                    vertical = orientation < 2  # True for ┗ and ┛, False for ┏ and ┓
-                    right = orientation % 2 == 1  # True for ┛ and ┓
-                    
-                    color = self.get_color(row, col)
-                    if color == Color.EMPTY:
-                        continue
-                    
-                    cells = set()
-                    valid = True
-                    
-                    # Check vertical part (3 cells)
-                    for i in range(3):
-                        r = row + (i if vertical else -i)
-                        c = col + (0 if vertical else (2 if right else 0))
-                        if not self.is_valid_position(r, c) or self.get_color(r, c) != color:
-                            valid = False
-                            break
-                        cells.add((r, c))
-                    
-                    if not valid:
-                        continue
-                    
-                    # Check horizontal part (3 cells)
-                    for i in range(3):
-                        r = row + (2 if vertical else 0)
-                        c = col + (i if right else -i)
-                        if not self.is_valid_position(r, c) or self.get_color(r, c) != color:
-                            valid = False
-                            break
-                        cells.add((r, c))
-                    
-                    if valid:
-                        # Only add if we haven't found this formation before
-                        found = False
-                        for existing in formations:
-                            if existing.cells == cells:
-                                found = True
-                                break
-                        if not found:
-                            formations.append(Formation(cells, 20))
-        
-        return formations
+        return self._lt_formations(_L_OFFSETS, 0, 2, 20)
     
     def find_t_formations(self) -> List[Formation]:
-        formations = []
-        # For each possible center of T
-        for row in range(1, self.rows - 1):
-            for col in range(1, self.cols - 1):
-                color = self.get_color(row, col)
-                if color == Color.EMPTY:
-                    continue
-                    
-                # Check each of the 4 possible T orientations
-                # orientation: 0=┳, 1=┻, 2=┫, 3=┣
-                for orientation in range(4):
-                    cells = {(row, col)}  # Center cell
-                    valid = True
-                    
-                    # Check the vertical part (2 more cells)
-                    if orientation < 2:  # Upright or downright T
-                        dr = -1 if orientation == 0 else 1
-                        for i in range(1, 3):
-                            r = row + (dr * i)
-                            if not self.is_valid_position(r, col) or self.get_color(r, col) != color:
-                                valid = False
-                                break
-                            cells.add((r, col))
-                            
-                        # If vertical part is valid, check horizontal part
-                        if valid:
-                            for dc in [-1, 1]:  # Check both sides
-                                if not self.is_valid_position(row, col + dc) or self.get_color(row, col + dc) != color:
-                                    valid = False
-                                    break
-                                cells.add((row, col + dc))
-                                
-                    else:  # Leftward or rightward T
-                        dc = -1 if orientation == 3 else 1
-                        for i in range(1, 3):
-                            c = col + (dc * i)
-                            if not self.is_valid_position(row, c) or self.get_color(row, c) != color:
-                                valid = False
-                                break
-                            cells.add((row, c))
-                            
-                        # If horizontal part is valid, check vertical part
-                        if valid:
-                            for dr in [-1, 1]:  # Check both up and down
-                                if not self.is_valid_position(row + dr, col) or self.get_color(row + dr, col) != color:
-                                    valid = False
-                                    break
-                                cells.add((row + dr, col))
-                                
-                    if valid:
-                        # Only add if we haven't found this formation before
-                        found = False
-                        for existing in formations:
-                            if existing.cells == cells:
-                                found = True
-                                break
-                        if not found:
-                            formations.append(Formation(cells, 30))
-        
-        return formations
+        # A T centre must be an interior cell
+        return self._lt_formations(_T_OFFSETS, 1, 1, 30)
     
     def apply_gravity(self) -> None:
-        for col in range(self.cols):
-            # Count empty cells and move candies down
-            empty_count = 0
-            for row in range(self.rows - 1, -1, -1):
-                if self.grid[row, col] == Color.EMPTY:
-                    empty_count += 1
-                elif empty_count > 0:
-                    self.grid[row + empty_count, col] = self.grid[row, col]
-                    self.grid[row, col] = Color.EMPTY
+        # Stable sort of each column on "is filled": empties float to the top and
+        # candies keep their relative order below them
+        order = np.argsort(self.grid != Color.EMPTY, axis=0, kind='stable')
+        self.grid[:] = np.take_along_axis(self.grid, order, axis=0)
+        self._bits_stale = True
     
     def refill_board(self) -> None:
-        for col in range(self.cols):
-            for row in range(self.rows):
-                if self.grid[row, col] == Color.EMPTY:
-                    self.grid[row, col] = np.random.randint(1, 5)
+        empty = self.grid == Color.EMPTY
+        self.grid[empty] = self._rng.integers(1, 5, size=int(empty.sum()), dtype=np.uint8)
+        self._bits_stale = True
     
     def try_swap(self, row1: int, col1: int, row2: int, col2: int) -> bool:
-        # Check if positions are adjacent
-        if not (abs(row1 - row2) == 1 and col1 == col2 or 
-                row1 == row2 and abs(col1 - col2) == 1):
+        # Check if positions are adjacent (orthogonal neighbours are exactly distance 1)
+        dr = row1 - row2
+        dc = col1 - col2
+        if dr * dr + dc * dc != 1:
+            return False
+        # The kernel does not bounds-check the swapped cells themselves
+        if not (self.is_valid_position(row1, col1) and self.is_valid_position(row2, col2)):
             return False
-            
-        # Perform swap
-        self.grid[row1, col1], self.grid[row2, col2] = \
-            self.grid[row2, col2], self.grid[row1, col1]
             
         # Optimized check: a valid swap must create a formation that includes at least
         # one of the swapped cells. Check only local neighborhoods instead of full scan.
-        created = self._swap_creates_formation(row1, col1, row2, col2)
-        if not created:
-            # Revert swap if no formations created
-            self.grid[row1, col1], self.grid[row2, col2] = \
-                self.grid[row2, col2], self.grid[row1, col1]
+        if not _local_hit_readonly(self.grid, row1, col1, row2, col2, _L_AROUND, _T_OFFSETS):
             return False
-
+            
+        # Perform swap
+        self._swap_cells(row1, col1, row2, col2)
         return True
 
     # --- Optimized local checks for swaps ---
-    def _run_length_horizontal(self, row: int, col: int) -> int:
-        """Return total contiguous run length horizontally that includes (row,col)."""
-        color = self.get_color(row, col)
+    def _run_horizontal(self, row: int, col: int) -> Tuple[int, int]:
+        """Return (first col, length) of the horizontal run that includes (row,col); length 0 if empty."""
+        if self._bits_stale:
+            self._sync_bits()
+        if self._row_bits is not None:
+            return _nibble_run(self._row_bits[row], col, self._row_ones, self.grid.shape[1])
+        color = self._c(row, col)
         if color == Color.EMPTY:
-            return 0
-        length = 1
+            return col, 0
         # left
-        c = col - 1
-        while c >= 0 and self.get_color(row, c) == color:
-            length += 1
-            c -= 1
+        left = col
+        while self._c(row, left - 1) == color:
+            left -= 1
         # right
-        c = col + 1
-        while c < self.cols and self.get_color(row, c) == color:
-            length += 1
-            c += 1
-        return length
+        right = col
+        while self._c(row, right + 1) == color:
+            right += 1
+        return left, right - left + 1
 
-    def _run_length_vertical(self, row: int, col: int) -> int:
-        """Return total contiguous run length vertically that includes (row,col)."""
-        color = self.get_color(row, col)
+    def _run_vertical(self, row: int, col: int) -> Tuple[int, int]:
+        """Return (first row, length) of the vertical run that includes (row,col); length 0 if empty."""
+        if self._bits_stale:
+            self._sync_bits()
+        if self._col_bits is not None:
+            return _nibble_run(self._col_bits[col], row, self._col_ones, self.grid.shape[0])
+        color = self._c(row, col)
         if color == Color.EMPTY:
-            return 0
-        length = 1
+            return row, 0
         # up
-        r = row - 1
-        while r >= 0 and self.get_color(r, col) == color:
-            length += 1
-            r -= 1
+        top = row
+        while self._c(top - 1, col) == color:
+            top -= 1
         # down
-        r = row + 1
-        while r < self.rows and self.get_color(r, col) == color:
-            length += 1
-            r += 1
-        return length
+        bottom = row
+        while self._c(bottom + 1, col) == color:
+            bottom += 1
+        return top, bottom - top + 1
 
     def _check_L_at(self, row: int, col: int) -> bool:
         """Check if an L (3+3) exists that includes (row,col) as any of its cells."""
-        color = self.get_color(row, col)
+        color = self._c(row, col)
         if color == Color.EMPTY:
             return False
         # enumerate possible L shapes centered within 3x3 neighborhoods
@@ -286,34 +378,34 @@ class Board:
                 cells = [(base_r + i, base_c) for i in range(3)] + [(base_r + 2, base_c + j) for j in range(3)]
             except Exception:
                 cells = []
-            if cells and all(self.is_valid_position(r, c) and self.get_color(r, c) == color for r, c in cells):
+            if cells and all(self.is_valid_position(r, c) and self._c(r, c) == color for r, c in cells):
                 return True
             # vertical down + horizontal left
             try:
                 cells = [(base_r + i, base_c + 2) for i in range(3)] + [(base_r + 2, base_c + 2 - j) for j in range(3)]
             except Exception:
                 cells = []
-            if cells and all(self.is_valid_position(r, c) and self.get_color(r, c) == color for r, c in cells):
+            if cells and all(self.is_valid_position(r, c) and self._c(r, c) == color for r, c in cells):
                 return True
             # vertical up + horizontal right
             try:
                 cells = [(base_r + 2 - i, base_c) for i in range(3)] + [(base_r, base_c + j) for j in range(3)]
             except Exception:
                 cells = []
-            if cells and all(self.is_valid_position(r, c) and self.get_color(r, c) == color for r, c in cells):
+            if cells and all(self.is_valid_position(r, c) and self._c(r, c) == color for r, c in cells):
                 return True
             # vertical up + horizontal left
             try:
                 cells = [(base_r + 2 - i, base_c + 2) for i in range(3)] + [(base_r, base_c + 2 - j) for j in range(3)]
             except Exception:
                 cells = []
-            if cells and all(self.is_valid_position(r, c) and self.get_color(r, c) == color for r, c in cells):
+            if cells and all(self.is_valid_position(r, c) and self._c(r, c) == color for r, c in cells):
                 return True
         return False
 
     def _check_T_at(self, row: int, col: int) -> bool:
         """Check if a T (3+3+3) exists that includes (row,col) as any of its cells or center nearby."""
-        color = self.get_color(row, col)
+        color = self._c(row, col)
         if color == Color.EMPTY:
             return False
         # Check centers within a 3x3 neighborhood (T center must be an interior cell)
@@ -323,7 +415,7 @@ class Board:
                 c = col + dc
                 if not self.is_valid_position(r, c):
                     continue
-                center_color = self.get_color(r, c)
+                center_color = self._c(r, c)
                 if center_color == Color.EMPTY:
                     continue
                 # vertical stem + horizontal crossbar
@@ -336,68 +428,54 @@ class Board:
                         # stem includes center and two above
                         for i in (1, 2):
                             nr = r - i
-                            if not self.is_valid_position(nr, c) or self.get_color(nr, c) != center_color:
+                            if not self.is_valid_position(nr, c) or self._c(nr, c) != center_color:
                                 valid = False; break
                             cells.add((nr, c))
                         if not valid: continue
                         # crossbar left/right of center
                         for nc in (c - 1, c + 1):
-                            if not self.is_valid_position(r, nc) or self.get_color(r, nc) != center_color:
+                            if not self.is_valid_position(r, nc) or self._c(r, nc) != center_color:
                                 valid = False; break
                             cells.add((r, nc))
                         if valid: return True
                     elif orient == 1:  # downright: stem down
                         for i in (1, 2):
                             nr = r + i
-                            if not self.is_valid_position(nr, c) or self.get_color(nr, c) != center_color:
+                            if not self.is_valid_position(nr, c) or self._c(nr, c) != center_color:
                                 valid = False; break
                             cells.add((nr, c))
                         if not valid: continue
                         for nc in (c - 1, c + 1):
-                            if not self.is_valid_position(r, nc) or self.get_color(r, nc) != center_color:
+                            if not self.is_valid_position(r, nc) or self._c(r, nc) != center_color:
                                 valid = False; break
                             cells.add((r, nc))
                         if valid: return True
                     elif orient == 2:  # rightwards: stem right
                         for i in (1, 2):
                             nc = c + i
-                            if not self.is_valid_position(r, nc) or self.get_color(r, nc) != center_color:
+                            if not self.is_valid_position(r, nc) or self._c(r, nc) != center_color:
                                 valid = False; break
                             cells.add((r, nc))
                         if not valid: continue
                         for nr in (r - 1, r + 1):
-                            if not self.is_valid_position(nr, c) or self.get_color(nr, c) != center_color:
+                            if not self.is_valid_position(nr, c) or self._c(nr, c) != center_color:
                                 valid = False; break
                             cells.add((nr, c))
                         if valid: return True
                     else:  # leftwards: stem left
                         for i in (1, 2):
                             nc = c - i
-                            if not self.is_valid_position(r, nc) or self.get_color(r, nc) != center_color:
+                            if not self.is_valid_position(r, nc) or self._c(r, nc) != center_color:
                                 valid = False; break
                             cells.add((r, nc))
                         if not valid: continue
                         for nr in (r - 1, r + 1):
-                            if not self.is_valid_position(nr, c) or self.get_color(nr, c) != center_color:
+                            if not self.is_valid_position(nr, c) or self._c(nr, c) != center_color:
                                 valid = False; break
                             cells.add((nr, c))
                         if valid: return True
         return False
 
-    def _swap_creates_formation(self, r1: int, c1: int, r2: int, c2: int) -> bool:
-        # After swap, check if either swapped cell is part of any formation (line >=3, L or T)
-        # Check local neighbourhoods only
-        if self._run_length_horizontal(r1, c1) >= 3 or self._run_length_vertical(r1, c1) >= 3:
-            return True
-        if self._run_length_horizontal(r2, c2) >= 3 or self._run_length_vertical(r2, c2) >= 3:
-            return True
-        # check for L or T around swapped cells
-        if self._check_L_at(r1, c1) or self._check_T_at(r1, c1):
-            return True
-        if self._check_L_at(r2, c2) or self._check_T_at(r2, c2):
-            return True
-        return False
-
     def local_score_for_swap(self, r1: int, c1: int, r2: int, c2: int) -> int:
         """Estimate immediate score produced by swapping the two cells.
         This is a local-only calculation that avoids full-board formation detection.
@@ -405,57 +483,28 @@ class Board:
         (lines, L, T) — this is used by the move-evaluator to rank swaps quickly.
         """
         # swap
-        self.grid[r1, c1], self.grid[r2, c2] = self.grid[r2, c2], self.grid[r1, c1]
+        self._swap_cells(r1, c1, r2, c2)
         score = 0
 
-        # check around both swapped positions within a small neighborhood
-        to_check = set()
-        for (r, c) in ((r1, c1), (r2, c2)):
-            for dr in (-2, -1, 0, 1, 2):
-                for dc in (-2, -1, 0, 1, 2):
-                    rr = r + dr
-                    cc = c + dc
-                    if 0 <= rr < self.rows and 0 <= cc < self.cols:
-                        to_check.add((rr, cc))
-
+        # A swap only changes the rows and columns of the two swapped cells, so on a
+        # settled board every new line runs through one of them: scan just those
+        # rows/columns once each instead of every cell of a 5x5 neighbourhood
         used_cells = set()
-        # first detect lines centered at any of these cells
-        for (r, c) in to_check:
-            if (r, c) in used_cells:
-                continue
-            # horizontal
-            hlen = self._run_length_horizontal(r, c)
+        for (r, c) in ((r1, c1), (r2, c2)):
+            # horizontal; the run extent comes back with its length, no re-walk needed
+            left, hlen = self._run_horizontal(r, c)
             if hlen >= 3:
-                # collect cell coordinates for the run
-                left = c
-                while left - 1 >= 0 and self.get_color(r, left - 1) == self.get_color(r, c):
-                    left -= 1
                 run_cells = {(r, cc) for cc in range(left, left + hlen)}
-                new_cells = run_cells - used_cells
-                if new_cells:
-                    used_cells.update(new_cells)
-                    if hlen == 3:
-                        score += 5
-                    elif hlen == 4:
-                        score += 10
-                    else:
-                        score += 50
+                if not run_cells <= used_cells:
+                    used_cells |= run_cells
+                    score += int(_SCORE_LUT[min(hlen, 5)])
             # vertical
-            vlen = self._run_length_vertical(r, c)
+            top, vlen = self._run_vertical(r, c)
             if vlen >= 3:
-                top = r
-                while top - 1 >= 0 and self.get_color(top - 1, c) == self.get_color(r, c):
-                    top -= 1
                 run_cells = {(rr, c) for rr in range(top, top + vlen)}
-                new_cells = run_cells - used_cells
-                if new_cells:
-                    used_cells.update(new_cells)
-                    if vlen == 3:
-                        score += 5
-                    elif vlen == 4:
-                        score += 10
-                    else:
-                        score += 50
+                if not run_cells <= used_cells:
+                    used_cells |= run_cells
+                    score += int(_SCORE_LUT[min(vlen, 5)])
 
         # L and T checks (local) — award their fixed scores if found and not overlapping
         for (r, c) in ((r1, c1), (r2, c2)):
@@ -479,65 +528,65 @@ class Board:
                 score += 30
 
         # revert swap
-        self.grid[r1, c1], self.grid[r2, c2] = self.grid[r2, c2], self.grid[r1, c1]
+        self._swap_cells(r1, c1, r2, c2)
         return score
     
     def find_all_formations(self) -> List[Formation]:
-        all_formations = []
-        all_formations.extend(self.find_line_formations())
-        all_formations.extend(self.find_l_formations())
-        all_formations.extend(self.find_t_formations())
+        line_formations = self.find_line_formations()
+        # T (30) then L (20): each list holds a single score, so together they are already sorted
+        lt_formations = self.find_t_formations() + self.find_l_formations()
+        if not lt_formations and len(line_formations) <= 1:
+            return line_formations
         
-        # Sort formations by score (highest first) to handle overlaps
-        all_formations.sort(key=lambda f: f.score, reverse=True)
+        # Sort formations by score (highest first) to handle overlaps; lines come
+        # out in scan order, so only they need sorting before merging in L/T
+        line_formations.sort(key=lambda f: f.score, reverse=True)
+        if lt_formations:
+            all_formations = list(heapq.merge(line_formations, lt_formations,
+                                              key=lambda f: f.score, reverse=True))
+        else:
+            all_formations = line_formations
         
         # Handle overlaps - remove formations that share cells with higher scoring formations
-        used_cells = set()
+        used = np.zeros(self.grid.size, dtype=bool)
         final_formations = []
         
         for formation in all_formations:
-            if not formation.cells & used_cells:  # No overlap with used cells
+            if not used[formation.cells].any():  # No overlap with used cells
                 final_formations.append(formation)
-                used_cells.update(formation.cells)
+                used[formation.cells] = True
         
         return final_formations
     
     def remove_formations(self, formations: List[Formation]) -> int:
         score = 0
-        removed_cells = set()
+        removed = np.zeros(self.grid.size, dtype=bool)
         
         for formation in formations:
-            # Only count score and remove cells that haven't been removed yet
-            new_cells = formation.cells - removed_cells
-            if new_cells:
+            # Only count score for formations with cells that haven't been removed yet
+            if not removed[formation.cells].all():
                 score += formation.score
-                removed_cells.update(new_cells)
+                removed[formation.cells] = True
         
-        # Set all removed cells to empty
-        for row, col in removed_cells:
-            self.grid[row, col] = Color.EMPTY
+        # Set all removed cells to empty in one store; flat writes through even
+        # if the grid is not C-contiguous, where reshape(-1) would copy
+        self.grid.flat[removed] = Color.EMPTY
+        self._bits_stale = True
             
         return score
     
     def find_possible_moves(self) -> List[Tuple[int, int, int, int]]:
         moves = []
+        grid = self.grid
         # Check all possible swaps
         for row in range(self.rows):
             for col in range(self.cols):
                 # Try right swap
-                if col < self.cols - 1:
-                    # perform swap and check locally
-                    self.grid[row, col], self.grid[row, col + 1] = self.grid[row, col + 1], self.grid[row, col]
-                    if self._swap_creates_formation(row, col, row, col + 1):
-                        moves.append((row, col, row, col + 1))
-                    # revert
-                    self.grid[row, col], self.grid[row, col + 1] = self.grid[row, col + 1], self.grid[row, col]
+                if col < self.cols - 1 and _local_hit_readonly(grid, row, col, row, col + 1, _L_AROUND, _T_OFFSETS):
+                    moves.append((row, col, row, col + 1))
                 
                 # Try down swap
-                if row < self.rows - 1:
-                    self.grid[row, col], self.grid[row + 1, col] = self.grid[row + 1, col], self.grid[row, col]
-                    if self._swap_creates_formation(row, col, row + 1, col):
-                        moves.append((row, col, row + 1, col))
-                    self.grid[row, col], self.grid[row + 1, col] = self.grid[row + 1, col], self.grid[row, col]
+                if row < self.rows - 1 and _local_hit_readonly(grid, row, col, row + 1, col, _L_AROUND, _T_OFFSETS):
+                    moves.append((row, col, row + 1, col))
         
         return moves
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""Numba kernels behind the optimized board's formation detection.
+
+The scans are inline bodies that take the raw int8 grid and its size and
+mark the cells they find in a bool mask of the same shape, leaving cells that
+are already marked untouched. _detect_all runs them with the runtime shape
+and the board's pattern_offsets tables. _detect_all_11 passes the literal 11x11 of
+the standard board, so LLVM sees compile-time trip counts, and swaps the
+data-driven L scan for one unrolled for the standard patterns. The
+_detect_union variants mark every detector's cells into a single mask and
+limit the vertical and L scans to a span of columns.
+"""
+import numpy as np
+from numba import njit
+
+# Grid size of the specialised detection kernel
+FIXED_ROWS = 11
+FIXED_COLS = 11
+
+@njit(cache=True, inline='always')
+def _mark_horizontal(grid, rows, cols, out_mask):
+    for r in range(rows):
+        start = 0
+        for c in range(1, cols + 1):
+            if c < cols and grid[r, c] == grid[r, start]:
+                continue
+            if c - start >= 3 and grid[r, start] != 0:
+                for k in range(start, c):
+                    out_mask[r, k] = True
+            start = c
+
+@njit(cache=True, inline='always')
+def _mark_vertical(grid, rows, c0, c1, out_mask):
+    for c in range(c0, c1):
+        start = 0
+        for r in range(1, rows + 1):
+            if r < rows and grid[r, c] == grid[start, c]:
+                continue
+            if r - start >= 3 and grid[start, c] != 0:
+                for k in range(start, r):
+                    out_mask[k, c] = True
+            start = r
+
+def pattern_offsets(patterns: np.ndarray) -> np.ndarray:
+    """Offset table for a stack of equal-shape bool L patterns, as the kernels take them.
+    
+    Row p lists every cell of pattern p's window as (row offset, col offset, set),
+    with the set cells first, so a kernel reads the colour at the first offset
+    and never walks the pattern array itself.
+    """
+    n_patterns, height, width = patterns.shape
+    offsets = np.empty((n_patterns, height * width, 3), dtype=np.int64)
+    for p, pattern in enumerate(patterns):
+        cells = sorted(np.ndindex(height, width), key=lambda cell: not pattern[cell])
+        offsets[p] = [(di, dj, pattern[di, dj]) for di, dj in cells]
+    return offsets
+
+@njit(cache=True, inline='always')
+def _pattern_extent(offsets, p):
+    """Height and width of pattern p's window."""
+    height, width = 0, 0
+    for k in range(offsets.shape[1]):
+        height = max(height, offsets[p, k, 0] + 1)
+        width = max(width, offsets[p, k, 1] + 1)
+    return height, width
+
+@njit(cache=True, inline='always')
+def _pattern_matches(grid, offsets, p, i, j):
+    """Whether the window at (i, j) exactly matches pattern p in a single colour.
+
+    Set pattern cells must hold the colour and unset ones must not; the colour
+    is read from the pattern's first set cell and is never EMPTY.
+    """
+    color = grid[i + offsets[p, 0, 0], j + offsets[p, 0, 1]]
+    if color == 0:
+        return False
+    for k in range(1, offsets.shape[1]):
+        if (grid[i + offsets[p, k, 0], j + offsets[p, k, 1]] == color) != offsets[p, k, 2]:
+            return False
+    return True
+
+@njit(cache=True, inline='always')
+def _mark_patterns(grid, rows, c0, c1, offsets, out_mask):
+    """Mark the cells of every window in columns [c0, c1) that exactly matches one of the patterns."""
+    for p in range(offsets.shape[0]):
+        height, width = _pattern_extent(offsets, p)
+        for i in range(rows - height + 1):
+            for j in range(c0, c1 - width + 1):
+                if not _pattern_matches(grid, offsets, p, i, j):
+                    continue
+                for k in range(offsets.shape[1]):
+                    if offsets[p, k, 2]:
+                        out_mask[i + offsets[p, k, 0], j + offsets[p, k, 1]] = True
+
+@njit(cache=True, inline='always')
+def _any_pattern_in(grid, offsets, r0, r1, c0, c1):
+    """Whether some pattern matches a window lying entirely inside rows [r0, r1) and cols [c0, c1)."""
+    for p in range(offsets.shape[0]):
+        height, width = _pattern_extent(offsets, p)
+        for i in range(r0, r1 - height + 1):
+            for j in range(c0, c1 - width + 1):
+                if _pattern_matches(grid, offsets, p, i, j):
+                    return True
+    return False
+
+@njit(cache=True, inline='always')
+def _mark_standard_l(grid, rows, c0, c1, out_mask):
+    """_mark_patterns unrolled for the board's six standard L patterns.
+
+    Each window's 3-cell base is checked once for all patterns sharing it:
+    the horizontal patterns are a full top row plus exactly one cell below it,
+    the vertical ones a full left column plus the top or bottom cell on its
+    right, or a full right column plus the middle cell on its left.
+    """
+    for i in range(rows - 1):
+        for j in range(c0, c1 - 2):
+            color = grid[i, j]
+            if color == 0 or grid[i, j + 1] != color or grid[i, j + 2] != color:
+                continue
+            left = grid[i + 1, j] == color
+            mid = grid[i + 1, j + 1] == color
+            right = grid[i + 1, j + 2] == color
+            if left + mid + right != 1:
+                continue
+            out_mask[i, j] = True
+            out_mask[i, j + 1] = True
+            out_mask[i, j + 2] = True
+            out_mask[i + 1, j] |= left
+            out_mask[i + 1, j + 1] |= mid
+            out_mask[i + 1, j + 2] |= right
+    for i in range(rows - 2):
+        for j in range(c0, c1 - 1):
+            color = grid[i, j]
+            if color != 0 and grid[i + 1, j] == color and grid[i + 2, j] == color:
+                top = grid[i, j + 1] == color
+                bottom = grid[i + 2, j + 1] == color
+                if top != bottom and grid[i + 1, j + 1] != color:
+                    out_mask[i, j] = True
+                    out_mask[i + 1, j] = True
+                    out_mask[i + 2, j] = True
+                    out_mask[i, j + 1] |= top
+                    out_mask[i + 2, j + 1] |= bottom
+            color = grid[i, j + 1]
+            if color != 0 and grid[i + 1, j + 1] == color and grid[i + 2, j + 1] == color:
+                if grid[i + 1, j] == color and grid[i, j] != color and grid[i + 2, j] != color:
+                    out_mask[i, j + 1] = True
+                    out_mask[i + 1, j + 1] = True
+                    out_mask[i + 2, j + 1] = True
+                    out_mask[i + 1, j] = True
+
+@njit(cache=True, inline='always')
+def _clear_mask(rows, cols, mask):
+    for r in range(rows):
+        for c in range(cols):
+            mask[r, c] = False
+
+@njit(cache=True, inline='always')
+def _clear_masks(rows, cols, h_mask, v_mask, l_mask):
+    for r in range(rows):
+        for c in range(cols):
+            h_mask[r, c] = False
+            v_mask[r, c] = False
+            l_mask[r, c] = False
+
+@njit(cache=True, boundscheck=False)
+def _detect_all(grid, offsets_h, offsets_v, h_mask, v_mask, l_mask):
+    """Clear the three masks and fill them with the horizontal, vertical and L cells in one call."""
+    rows, cols = grid.shape
+    _clear_masks(rows, cols, h_mask, v_mask, l_mask)
+    _mark_horizontal(grid, rows, cols, h_mask)
+    _mark_vertical(grid, rows, 0, cols, v_mask)
+    _mark_patterns(grid, rows, 0, cols, offsets_h, l_mask)
+    _mark_patterns(grid, rows, 0, cols, offsets_v, l_mask)
+
+@njit(cache=True, boundscheck=False)
+def _detect_all_11(grid, h_mask, v_mask, l_mask):
+    """_detect_all specialised for FIXED_ROWS x FIXED_COLS grids and the standard L patterns.
+
+    Neither the shape nor the patterns are checked; the board only calls this
+    for the standard 11x11 setup.
+    """
+    _clear_masks(FIXED_ROWS, FIXED_COLS, h_mask, v_mask, l_mask)
+    _mark_horizontal(grid, FIXED_ROWS, FIXED_COLS, h_mask)
+    _mark_vertical(grid, FIXED_ROWS, 0, FIXED_COLS, v_mask)
+    _mark_standard_l(grid, FIXED_ROWS, 0, FIXED_COLS, l_mask)
+
+@njit(cache=True, boundscheck=False)
+def _detect_union(grid, c0, c1, offsets_h, offsets_v, out_mask):
+    """_detect_all with every detector marking into the one cleared out_mask.
+
+    Vertical lines and L windows are only looked for inside columns [c0, c1);
+    horizontal runs are still scanned across whole rows so they are marked in full.
+    """
+    rows, cols = grid.shape
+    _clear_mask(rows, cols, out_mask)
+    _mark_horizontal(grid, rows, cols, out_mask)
+    _mark_vertical(grid, rows, c0, c1, out_mask)
+    _mark_patterns(grid, rows, c0, c1, offsets_h, out_mask)
+    _mark_patterns(grid, rows, c0, c1, offsets_v, out_mask)
+
+@njit(cache=True, boundscheck=False)
+def _detect_union_11(grid, c0, c1, out_mask):
+    """_detect_union specialised like _detect_all_11."""
+    _clear_mask(FIXED_ROWS, FIXED_COLS, out_mask)
+    _mark_horizontal(grid, FIXED_ROWS, FIXED_COLS, out_mask)
+    _mark_vertical(grid, FIXED_ROWS, c0, c1, out_mask)
+    _mark_standard_l(grid, FIXED_ROWS, c0, c1, out_mask)
+
+@njit(cache=True, boundscheck=False)
+def _has_formation_in(grid, r0, r1, c0, c1, offsets_h, offsets_v):
+    """Whether grid[r0:r1, c0:c1] holds a line of 3 or an exact L pattern match.
+
+    The bounds are clipped to the grid; the scan stops at the first hit.
+    """
+    rows, cols = grid.shape
+    r0 = max(r0, 0)
+    c0 = max(c0, 0)
+    r1 = min(r1, rows)
+    c1 = min(c1, cols)
+    for r in range(r0, r1):
+        for c in range(c0, c1):
+            color = grid[r, c]
+            if color == 0:
+                continue
+            if c + 2 < c1 and grid[r, c + 1] == color and grid[r, c + 2] == color:
+                return True
+            if r + 2 < r1 and grid[r + 1, c] == color and grid[r + 2, c] == color:
+                return True
+    return (_any_pattern_in(grid, offsets_h, r0, r1, c0, c1)
+            or _any_pattern_in(grid, offsets_v, r0, r1, c0, c1))
+
+def warm_up_kernels(offsets_h: np.ndarray, offsets_v: np.ndarray) -> None:
+    """Compile every kernel for int8 grids and pattern_offsets tables, or load it from the on-disk cache."""
+    grid = np.zeros((1, 1), dtype=np.int8)
+    mask = np.zeros((1, 1), dtype=np.bool_)
+    _detect_all(grid, offsets_h, offsets_v, mask, mask, mask)
+    fixed = np.zeros((FIXED_ROWS, FIXED_COLS), dtype=np.int8)
+    fixed_mask = np.zeros((FIXED_ROWS, FIXED_COLS), dtype=np.bool_)
+    _detect_all_11(fixed, fixed_mask, fixed_mask, fixed_mask)
+    _detect_union(grid, 0, 1, offsets_h, offsets_v, mask)
+    _detect_union_11(fixed, 0, 1, fixed_mask)
+    _has_formation_in(grid, 0, 1, 0, 1, offsets_h, offsets_v)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 from enum import IntEnum
 import numpy as np
-from typing import List, Tuple, Set, Optional
+from typing import List, Tuple, Optional
+from .board_numba import (FIXED_COLS, FIXED_ROWS, _detect_all, _detect_all_11, _detect_union,
+                          _detect_union_11, _has_formation_in, pattern_offsets, warm_up_kernels)
 
 class Color(IntEnum):
     """Enum for candy colors."""
@@ -14,22 +16,45 @@ class Color(IntEnum):
     PURPLE = 6
 
 class Board:
-    """Optimized board class using NumPy operations."""
-    def __init__(self, rows: int = 11, cols: int = 11, predefined_board: Optional[np.ndarray] = None):
+    """Optimized board class using NumPy operations.
+    
+    Detection results are cached per grid state. Board methods that write the
+    grid set _dirty; code writing self.grid directly must do the same before
+    detecting again.
+    """
+    __slots__ = ('rows', 'cols', 'grid', 'l_patterns_h', 'l_patterns_v', 'l_offsets_h', 'l_offsets_v',
+                 '_rng', '_h_mask', '_v_mask', '_l_mask', '_dirty')
+    
+    def __init__(self, rows: int = 11, cols: int = 11, predefined_board: Optional[np.ndarray] = None,
+                 rng: Optional[np.random.Generator] = None):
         self.rows = rows
         self.cols = cols
+        self._rng = rng if rng is not None else np.random.default_rng()
+        
+        # Pre-compute pattern matrices for L and T shapes (used by the
+        # formation check below)
+        self._init_pattern_matrices()
+        
+        # One mask per detector for the current grid, recomputed by the next
+        # detection after the grid changes
+        self._h_mask = np.zeros((rows, cols), dtype=bool)
+        self._v_mask = np.zeros((rows, cols), dtype=bool)
+        self._l_mask = np.zeros((rows, cols), dtype=bool)
+        self._dirty = True
+        warm_up_kernels(self.l_offsets_h, self.l_offsets_v)
         
         if predefined_board is not None:
-            self.grid = predefined_board.copy()
+            # The kernels are compiled for C-contiguous int8 grids
+            self.grid = np.array(predefined_board, dtype=np.int8, order='C')
         else:
-            self.grid = np.random.randint(1, 7, size=(rows, cols), dtype=np.int8)
+            self.grid = self._rng.integers(1, 7, size=(rows, cols), dtype=np.int8)
             
-            # Clear any initial formations
-            while self.find_all_formations():
+            # Clear any initial formations by re-drawing their cells
+            formations = self.find_all_formations()
+            while formations.any():
+                self.remove_formations(formations)
                 self.refill_board()
-                
-        # Pre-compute pattern matrices for L and T shapes
-        self._init_pattern_matrices()
+                formations = self.find_all_formations()
         
     def _init_pattern_matrices(self):
         """Initialize pattern matrices for formation detection."""
@@ -60,184 +85,202 @@ class Board:
              [0, 1]]
         ], dtype=bool)
         
+        # The kernels walk the patterns' cells through these offset tables
+        self.l_offsets_h = pattern_offsets(self.l_patterns_h)
+        self.l_offsets_v = pattern_offsets(self.l_patterns_v)
+        
     def is_valid_pos(self, row: int, col: int) -> bool:
         """Check if position is within grid bounds."""
         return 0 <= row < self.rows and 0 <= col < self.cols
         
-    def try_swap(self, row1: int, col1: int, row2: int, col2: int) -> bool:
-        """Attempt to swap two cells."""
+    def try_swap(self, row1: int, col1: int, row2: int, col2: int) -> Optional[np.ndarray]:
+        """Attempt to swap two cells.
+        
+        Returns the mask of formations the swap creates, or None if the swap was rejected.
+        """
         # Validate positions
         if not (self.is_valid_pos(row1, col1) and self.is_valid_pos(row2, col2)):
-            return False
+            return None
             
         # Only allow adjacent swaps
         if abs(row1 - row2) + abs(col1 - col2) != 1:
-            return False
+            return None
             
         # Temporarily swap
         self.grid[row1, col1], self.grid[row2, col2] = \
             self.grid[row2, col2], self.grid[row1, col1]
+        self._dirty = True
             
         # Check if swap creates any formations
-        formations = self.find_all_formations()
+        formations = np.empty((self.rows, self.cols), dtype=bool)
+        self.find_all_formations_fused(formations)
         
-        if not formations:
+        if not formations.any():
             # Revert invalid swap
             self.grid[row1, col1], self.grid[row2, col2] = \
                 self.grid[row2, col2], self.grid[row1, col1]
-            return False
+            self._dirty = True
+            return None
             
-        return True
+        return formations
         
-    def find_horizontal_lines(self) -> Set[Tuple[int, int]]:
-        """Find horizontal lines of 3 or more using NumPy operations."""
-        cells = set()
+    def _run_kernels(self, h_mask: np.ndarray, v_mask: np.ndarray, l_mask: np.ndarray):
+        """Clear and fill the three detector masks for the current grid."""
+        # The standard board gets the kernel specialised for its size and patterns
+        if self.grid.shape == (FIXED_ROWS, FIXED_COLS):
+            _detect_all_11(self.grid, h_mask, v_mask, l_mask)
+        else:
+            _detect_all(self.grid, self.l_offsets_h, self.l_offsets_v, h_mask, v_mask, l_mask)
         
-        # Use rolling window approach
-        for row in range(self.rows):
-            # Get current row
-            current_row = self.grid[row]
-            
-            # Find runs of same color
-            change_points = np.where(current_row[1:] != current_row[:-1])[0] + 1
-            run_starts = np.r_[0, change_points]
-            run_ends = np.r_[change_points, len(current_row)]
-            
-            # Check each run
-            for start, end in zip(run_starts, run_ends):
-                if end - start >= 3 and current_row[start] != Color.EMPTY:
-                    # Add all cells in the run
-                    cells.update((row, col) for col in range(start, end))
-                    
-        return cells
+    def _detect(self):
+        """Run every detection kernel on the current grid unless its results are still cached."""
+        if not self._dirty:
+            return
+        self._run_kernels(self._h_mask, self._v_mask, self._l_mask)
+        self._dirty = False
         
-    def find_vertical_lines(self) -> Set[Tuple[int, int]]:
-        """Find vertical lines of 3 or more using NumPy operations."""
-        # Transpose grid and use horizontal line detection
-        transposed = self.grid.T
-        cells = set()
+    def find_horizontal_lines(self) -> np.ndarray:
+        """Find horizontal lines of 3 or more; returns a fresh bool mask of their cells."""
+        self._detect()
+        return self._h_mask.copy()
         
-        for col in range(self.cols):
-            current_col = transposed[col]
-            
-            change_points = np.where(current_col[1:] != current_col[:-1])[0] + 1
-            run_starts = np.r_[0, change_points]
-            run_ends = np.r_[change_points, len(current_col)]
-            
-            for start, end in zip(run_starts, run_ends):
-                if end - start >= 3 and current_col[start] != Color.EMPTY:
-                    cells.update((row, col) for row in range(start, end))
-                    
-        return cells
+    def find_vertical_lines(self) -> np.ndarray:
+        """Find vertical lines of 3 or more; returns a fresh bool mask of their cells."""
+        self._detect()
+        return self._v_mask.copy()
         
-    def find_l_shapes(self) -> Set[Tuple[int, int]]:
-        """Find L-shaped formations using pre-computed patterns."""
-        cells = set()
+    def find_l_shapes(self) -> np.ndarray:
+        """Find L-shaped formations; returns a fresh bool mask of their cells."""
+        self._detect()
+        return self._l_mask.copy()
         
-        # Scan for each color
-        for color in range(1, 7):  # Skip EMPTY
-            color_mask = (self.grid == color)
-            
-            # Check horizontal base L patterns
-            for pattern in self.l_patterns_h:
-                for i in range(self.rows - 1):
-                    for j in range(self.cols - 2):
-                        window = color_mask[i:i+2, j:j+3]
-                        if window.shape == pattern.shape and np.all(window == pattern):
-                            cells.update((r + i, c + j) 
-                                      for r, c in zip(*np.where(pattern)))
-                            
-            # Check vertical base L patterns
-            for pattern in self.l_patterns_v:
-                for i in range(self.rows - 2):
-                    for j in range(self.cols - 1):
-                        window = color_mask[i:i+3, j:j+2]
-                        if window.shape == pattern.shape and np.all(window == pattern):
-                            cells.update((r + i, c + j) 
-                                      for r, c in zip(*np.where(pattern)))
-                            
-        return cells
-        
-    def find_all_formations(self) -> Set[Tuple[int, int]]:
-        """Find all valid formations on the board."""
-        formations = set()
-        
-        # Collect cells from different formation types
-        formations.update(self.find_horizontal_lines())
-        formations.update(self.find_vertical_lines())
-        formations.update(self.find_l_shapes())
+    def find_all_formations(self) -> np.ndarray:
+        """Find all valid formations on the board; returns a fresh bool mask of their cells."""
+        self._detect()
+        return self._h_mask | self._v_mask | self._l_mask
         
-        return formations
+    def find_all_formations_fused(self, out_mask: np.ndarray, dirty_cols: Optional[np.ndarray] = None) -> None:
+        """Write find_all_formations' result into out_mask instead of a fresh array.
+        
+        A single kernel marks every detector's cells straight into out_mask, without
+        filling the per-detector masks, which stay stale for the next detector call.
+        
+        dirty_cols is the column mask returned by remove_formations for a removal of
+        every formation on the board; gravity and refill since then must only have
+        touched those columns. Any formation now must then cross a dirty column, so
+        vertical lines and L windows are only searched within 2 columns of the
+        dirty span. The result still equals find_all_formations.
+        """
+        col_span = None if dirty_cols is None else self._col_span(dirty_cols)
+        if not self._dirty:
+            # Cached results are reused as they are
+            np.bitwise_or(self._h_mask, self._v_mask, out=out_mask)
+            out_mask |= self._l_mask
+            return
+        c0, c1 = col_span if col_span is not None else (0, self.cols)
+        if self.grid.shape == (FIXED_ROWS, FIXED_COLS):
+            _detect_union_11(self.grid, c0, c1, out_mask)
+        else:
+            _detect_union(self.grid, c0, c1, self.l_offsets_h, self.l_offsets_v, out_mask)
+        
+    def _col_span(self, dirty_cols: np.ndarray) -> Tuple[int, int]:
+        """Columns [c0, c1) whose windows can hold a formation crossing a dirty column."""
+        dirty = np.flatnonzero(dirty_cols)
+        if not len(dirty):
+            return 0, 0
+        return max(0, int(dirty[0]) - 2), min(self.cols, int(dirty[-1]) + 3)
         
-    def remove_formations(self, formations: Set[Tuple[int, int]]) -> int:
-        """Remove formations and return points earned."""
-        if not formations:
-            return 0
+    def find_all_formations_detailed(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Find all formations along with the cells each detector found.
+        
+        Returns fresh bool masks (all_cells, horizontal_cells, vertical_cells, l_cells)
+        from a single detection pass.
+        """
+        self._detect()
+        return (self._h_mask | self._v_mask | self._l_mask, self._h_mask.copy(),
+                self._v_mask.copy(), self._l_mask.copy())
+        
+    def remove_formations(self, formations: np.ndarray) -> Tuple[int, np.ndarray]:
+        """Remove the cells marked in a formation mask.
+        
+        Returns the points earned and a bool mask of the columns that lost a candy,
+        the only ones gravity and refill will change.
+        """
+        dirty_cols = formations.any(axis=0)
+        count = int(np.count_nonzero(formations))
+        if not count:
+            return 0, dirty_cols
             
         # Set cells to empty
-        for row, col in formations:
-            self.grid[row, col] = Color.EMPTY
+        self.grid[formations] = Color.EMPTY
+        self._dirty = True
             
-        return len(formations) * 100
+        return count * 100, dirty_cols
         
     def apply_gravity(self):
         """Apply gravity to make candies fall."""
-        # Process each column
-        for col in range(self.cols):
-            # Find non-empty cells in column
-            column = self.grid[:, col]
-            non_empty = column[column != Color.EMPTY]
-            
-            # Pad with empty cells at top
-            new_column = np.pad(
-                non_empty,
-                (self.rows - len(non_empty), 0),
-                mode='constant',
-                constant_values=Color.EMPTY
-            )
-            
-            # Update column
-            self.grid[:, col] = new_column
+        # Stable sort of each column on "is filled": empties float to the top and
+        # candies keep their relative order below them. Written back in place so
+        # the grid stays the C-contiguous int8 array the kernels expect
+        order = np.argsort(self.grid != Color.EMPTY, axis=0, kind='stable')
+        self.grid[:] = np.take_along_axis(self.grid, order, axis=0)
+        self._dirty = True
             
     def refill_board(self):
         """Fill empty cells with random new candies."""
         empty_mask = (self.grid == Color.EMPTY)
-        num_empty = np.sum(empty_mask)
         
-        if num_empty > 0:
-            # Generate random colors for empty cells
-            new_colors = np.random.randint(1, 7, size=num_empty, dtype=np.int8)
-            self.grid[empty_mask] = new_colors
+        if empty_mask.any():
+            # Draw a colour for every cell and copy in only the empty ones, in place
+            new_colors = self._rng.integers(1, 7, size=self.grid.shape, dtype=np.int8)
+            np.copyto(self.grid, new_colors, where=empty_mask)
+            self._dirty = True
             
+    def _has_formation_around(self, row: int, col: int, radius: int = 2) -> bool:
+        """Check for a formation within radius cells of (row, col)."""
+        return _has_formation_in(self.grid, row - radius, row + radius + 1,
+                                 col - radius, col + radius + 1,
+                                 self.l_offsets_h, self.l_offsets_v)
+        
     def find_possible_moves(self) -> List[Tuple[int, int, int, int]]:
         """Find all possible moves that would create formations."""
         moves = []
+        grid = self.grid
+        
+        # Every candidate swap is reverted and only the uncached local check
+        # reads the grid in between, so the detection cache stays valid
         
         # Check horizontal swaps
         for row in range(self.rows):
             for col in range(self.cols - 1):
                 # Try swap
-                self.grid[row, [col, col+1]] = self.grid[row, [col+1, col]]
+                tmp = grid[row, col]
+                grid[row, col] = grid[row, col+1]
+                grid[row, col+1] = tmp
                 
-                # Keep if creates formation
-                if self.find_all_formations():
+                # Keep if creates formation next to either swapped cell
+                if self._has_formation_around(row, col) or self._has_formation_around(row, col+1):
                     moves.append((row, col, row, col+1))
                     
                 # Revert swap
-                self.grid[row, [col, col+1]] = self.grid[row, [col+1, col]]
+                grid[row, col+1] = grid[row, col]
+                grid[row, col] = tmp
                 
         # Check vertical swaps
         for row in range(self.rows - 1):
             for col in range(self.cols):
                 # Try swap
-                self.grid[[row, row+1], col] = self.grid[[row+1, row], col]
+                tmp = grid[row, col]
+                grid[row, col] = grid[row+1, col]
+                grid[row+1, col] = tmp
                 
-                # Keep if creates formation
-                if self.find_all_formations():
+                # Keep if creates formation next to either swapped cell
+                if self._has_formation_around(row, col) or self._has_formation_around(row+1, col):
                     moves.append((row, col, row+1, col))
                     
                 # Revert swap
-                self.grid[[row, row+1], col] = self.grid[[row+1, row], col]
+                grid[row+1, col] = grid[row, col]
+                grid[row, col] = tmp
                 
         return moves
         
@@ -252,19 +295,20 @@ class Board:
         # Try swap
         self.grid[row1, col1] = orig_val2
         self.grid[row2, col2] = orig_val1
+        self._dirty = True
         
         # Check formations
-        formations = self.find_all_formations()
-        if formations:
+        formations, _, _, l_shapes = self.find_all_formations_detailed()
+        if formations.any():
             # Base score from formation size
-            score = len(formations) * 100
+            score = int(np.count_nonzero(formations)) * 100
             
             # Bonus for L shapes (more complex, likely to trigger cascades)
-            l_shapes = self.find_l_shapes()
-            score *= (1 + 0.2 * len(l_shapes))
+            score *= (1 + 0.2 * int(np.count_nonzero(l_shapes)))
             
         # Restore original state
         self.grid[row1, col1] = orig_val1
         self.grid[row2, col2] = orig_val2
+        self._dirty = True
         
         return score
\ No newline at end of file
@@ -4,6 +4,9 @@ import numpy as np
 from typing import Optional, List, Tuple
 from .board import Board
 
+# A swap scoring this much (a line of 5) is taken without scoring the remaining candidates
+_EARLY_ACCEPT_SCORE = 50
+
 class StoppingReason(str, Enum):
     REACHED_TARGET = "REACHED_TARGET"
     NO_MOVES = "NO_MOVES"
@@ -19,11 +22,14 @@ class GameStats:
     moves_to_10000: Optional[int]
 
 class GameManager:
-    def __init__(self, rows: int = 11, cols: int = 11, target: int = 10000, predefined_board: Optional[np.ndarray] = None):
+    __slots__ = ('rows', 'cols', 'target', 'board', 'score', 'swaps', 'total_cascades', 'moves_to_10000')
+    
+    def __init__(self, rows: int = 11, cols: int = 11, target: int = 10000, predefined_board: Optional[np.ndarray] = None,
+                 rng: Optional[np.random.Generator] = None):
         self.rows = rows
         self.cols = cols
         self.target = target
-        self.board = Board(rows, cols, predefined_board)
+        self.board = Board(rows, cols, predefined_board, rng)
         self.score = 0
         self.swaps = 0
         self.total_cascades = 0
@@ -70,6 +76,8 @@ class GameManager:
         for move in possible_moves:
             row1, col1, row2, col2 = move
             score = self.board.local_score_for_swap(row1, col1, row2, col2)
+            if score >= _EARLY_ACCEPT_SCORE:
+                return move
             if score > best_score:
                 best_score = score
                 best_move = move
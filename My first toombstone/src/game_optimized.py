@@ -1,8 +1,11 @@
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
-from typing import Optional, List, Tuple, Dict
-from .board_optimized import Board
+from typing import Optional, List, Tuple
+from .board_optimized import Board, Color
+
+# A move scoring this much (5+ cells) is taken without scoring the remaining candidates
+_EARLY_ACCEPT_SCORE = 500
 
 class StoppingReason(str, Enum):
     REACHED_TARGET = "REACHED_TARGET"
@@ -18,36 +21,57 @@ class GameStats:
     stopping_reason: StoppingReason
     moves_to_10000: Optional[int]
 
+def _is_gapped_pair(window: np.ndarray) -> bool:
+    """Whether a window of 3+ cells holds exactly two candies of one colour and is otherwise empty.
+    
+    A plain loop over the few cells beats numpy's per-call overhead here.
+    """
+    filled = [value for value in window.tolist() if value != Color.EMPTY]
+    return len(filled) == 2 and filled[0] == filled[1] and len(filled) < len(window)
+
 class GameManager:
-    def __init__(self, rows: int = 11, cols: int = 11, target: int = 10000, predefined_board: Optional[np.ndarray] = None):
+    __slots__ = ('rows', 'cols', 'target', 'board', 'score', 'swaps', 'total_cascades', 'moves_to_10000',
+                 'move_history', '_formation_mask')
+    
+    def __init__(self, rows: int = 11, cols: int = 11, target: int = 10000, predefined_board: Optional[np.ndarray] = None,
+                 rng: Optional[np.random.Generator] = None):
         self.rows = rows
         self.cols = cols
         self.target = target
-        self.board = Board(rows, cols, predefined_board)
+        self.board = Board(rows, cols, predefined_board, rng=rng)
         self.score = 0
         self.swaps = 0
         self.total_cascades = 0
         self.moves_to_10000 = None
         
-        # Cache to avoid move repetition
-        self.move_history: Dict[Tuple[int, int, int, int], int] = {}
+        # Times each move was played, indexed [row1, col1, row2, col2] to avoid move repetition
+        self.move_history = np.zeros((rows, cols, rows, cols), dtype=np.int32)
+        
+        # Reused by every cascade step for the board's formation mask
+        self._formation_mask = np.zeros((rows, cols), dtype=bool)
     
-    def process_formations(self) -> int:
-        """Process formations in batches for better performance."""
+    def process_formations(self, initial: Optional[np.ndarray] = None) -> int:
+        """Process formations in batches for better performance.
+        
+        initial, if given, is the board's current formation mask (e.g. as returned
+        by try_swap) and saves detecting it again.
+        """
         score = 0
         
         # Process formations in batches for better performance
-        formations = self.board.find_all_formations()
-        while formations:
-            batch_score = self.board.remove_formations(formations)
+        formations = initial if initial is not None else self.board.find_all_formations()
+        while formations.any():
+            batch_score, dirty_cols = self.board.remove_formations(formations)
             self.board.apply_gravity()
             self.board.refill_board()
             score += batch_score
             self.total_cascades += 1
-            formations = self.board.find_all_formations()
+            # Only the columns that lost candies changed, so only they can hold new formations
+            formations = self._formation_mask
+            self.board.find_all_formations_fused(formations, dirty_cols)
             
             # Early exit if no valid formations
-            if not formations:
+            if not formations.any():
                 break
                 
         return score
@@ -55,16 +79,16 @@ class GameManager:
     def make_move(self, row1: int, col1: int, row2: int, col2: int) -> bool:
         """Attempt move with cascade processing."""
         # Skip invalid moves
-        if not self.board.try_swap(row1, col1, row2, col2):
+        formations = self.board.try_swap(row1, col1, row2, col2)
+        if formations is None:
             return False
             
         # Move was valid
         self.swaps += 1
-        move = (row1, col1, row2, col2)
-        self.move_history[move] = self.move_history.get(move, 0) + 1
+        self.move_history[row1, col1, row2, col2] += 1
         
         # Process formations and cascades
-        points = self.process_formations()
+        points = self.process_formations(initial=formations)
         self.score += points
         
         # Check 10k milestone
@@ -86,7 +110,7 @@ class GameManager:
             base_score = self.board.local_score_for_swap(row1, col1, row2, col2)
             
             # Penalize repeated moves
-            if move in self.move_history:
+            if self.move_history[row1, col1, row2, col2] > 0:
                 base_score *= 0.8  # 20% penalty for repeated moves
                 
             # Bonus for moves that could create cascades
@@ -95,13 +119,18 @@ class GameManager:
             
             scored_moves.append((move, total_score))
             
+            # Strong enough: accept it and skip scoring the rest
+            if total_score >= _EARLY_ACCEPT_SCORE:
+                scored_moves = scored_moves[-1:]
+                break
+            
         # Sort by score and take best
         scored_moves.sort(key=lambda x: x[1], reverse=True)
         
         if scored_moves:
             best_move = scored_moves[0][0]
             # Update history
-            self.move_history[best_move] = self.move_history.get(best_move, 0) + 1
+            self.move_history[best_move] += 1
             return best_move
             
         return None
@@ -117,21 +146,13 @@ class GameManager:
                 for r in range(max(0, row-3), row):
                     # Two same colors with one gap could form a line
                     window = self.board.grid[r:r+3, col]
-                    if len(window) >= 3:
-                        values, counts = np.unique(window, return_counts=True)
-                        if len(values) == 2 and Color.EMPTY in values:
-                            color_count = counts[values != Color.EMPTY][0]
-                            if color_count == 2:
-                                potential += 0.5  # Potential line of 3
+                    if len(window) >= 3 and _is_gapped_pair(window):
+                        potential += 0.5  # Potential line of 3
                                 
             # Check horizontal potential
             window = self.board.grid[row, max(0, col-2):col+3]
-            if len(window) >= 3:
-                values, counts = np.unique(window, return_counts=True)
-                if len(values) == 2 and Color.EMPTY in values:
-                    color_count = counts[values != Color.EMPTY][0]
-                    if color_count == 2:
-                        potential += 0.5  # Potential line of 3
+            if len(window) >= 3 and _is_gapped_pair(window):
+                potential += 0.5  # Potential line of 3
                         
         return min(potential, 2.0)  # Cap at 200% bonus
     
@@ -141,7 +162,7 @@ class GameManager:
         self.score = self.process_formations()
         
         # Clear move history for fresh game
-        self.move_history.clear()
+        self.move_history.fill(0)
         
         while True:
             # Early exit check
@@ -1,20 +1,30 @@
 import numpy as np
 import csv
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Optional
 from dataclasses import asdict
+from .board import warm_up_kernels
 from .game import GameManager, GameStats
 
 class TournamentManager:
     def __init__(self, num_games: int = 100, rows: int = 11, cols: int = 11, 
                  target: int = 10000, input_predefined: bool = False, 
-                 input_file: Optional[str] = None):
+                 input_file: Optional[str] = None, workers: int = 1,
+                 base_seed: Optional[int] = None):
         self.num_games = num_games
         self.rows = rows
         self.cols = cols
         self.target = target
         self.input_predefined = input_predefined
         self.input_file = input_file
+        self.workers = workers
+        # Root of the per-game seeds; without base_seed it is drawn from OS entropy once
+        self.seed_sequence = np.random.SeedSequence(base_seed)
+        # spawn advances the sequence, so the per-game seeds are drawn once here
+        # and every call to play_games reuses them
+        self.game_seeds = self.seed_sequence.spawn(num_games)
         self.stats: List[GameStats] = []
     
     def load_predefined_board(self, game_id: int) -> Optional[np.ndarray]:
@@ -31,21 +41,46 @@ class TournamentManager:
                     board = np.array([
                         [int(x) for x in line.strip().split()]
                         for line in board_lines
-                    ], dtype=np.int8)
+                    ], dtype=np.uint8)
                     if board.shape == (self.rows, self.cols):
                         return board
         except Exception as e:
             print(f"Error loading predefined board: {e}")
         return None
     
-    def run_tournament(self) -> None:
-        """Run all games in the tournament."""
-        for game_id in range(self.num_games):
+    def play_games(self, start: int, stop: int) -> List[GameStats]:
+        """Play games start..stop-1 and return their statistics."""
+        results = []
+        for game_id in range(start, stop):
             board = self.load_predefined_board(game_id)
-            game = GameManager(self.rows, self.cols, self.target, board)
+            # Every game gets its own independent stream, identical however games are sharded
+            rng = np.random.default_rng(self.game_seeds[game_id])
+            game = GameManager(self.rows, self.cols, self.target, board, rng)
             stats = game.play_game()
             stats.game_id = game_id
-            self.stats.append(stats)
+            results.append(stats)
+        return results
+    
+    def run_tournament(self) -> None:
+        """Run all games in the tournament, sharded across worker processes when workers > 1."""
+        workers = min(self.workers, self.num_games)
+        if workers <= 1:
+            self.stats.extend(self.play_games(0, self.num_games))
+            return
+        
+        # Contiguous game_id ranges, one per worker, so results merge back in order
+        bounds = [0]
+        for i in range(workers):
+            bounds.append(bounds[-1] + self.num_games // workers + (i < self.num_games % workers))
+        # Compile/cache the board kernels here so workers only load them
+        warm_up_kernels()
+        params = (self.num_games, self.rows, self.cols, self.target, self.input_predefined,
+                  self.input_file, self.seed_sequence.entropy)
+        # spawn keeps workers independent of the parent's state and works on Windows too
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            for shard in executor.map(_run_shard, [(params, bounds[i], bounds[i + 1]) for i in range(workers)]):
+                self.stats.extend(shard)
     
     def save_results(self, output_file: str) -> None:
         """Save tournament results to CSV file."""
@@ -77,4 +112,12 @@ class TournamentManager:
         print(f"Average swaps per game: {total_swaps / len(self.stats):.2f}")
         print(f"Games reaching target ({self.target}): {games_reached_target}")
         if moves_to_target:
-            print(f"Average moves to reach target: {sum(moves_to_target) / len(moves_to_target):.2f}")
\ No newline at end of file
+            print(f"Average moves to reach target: {sum(moves_to_target) / len(moves_to_target):.2f}")
+
+def _run_shard(args) -> List[GameStats]:
+    """Worker entry point: play one contiguous range of games in a fresh TournamentManager."""
+    (num_games, rows, cols, target, input_predefined, input_file, base_seed), start, stop = args
+    tournament = TournamentManager(num_games=num_games, rows=rows, cols=cols, target=target,
+                                   input_predefined=input_predefined, input_file=input_file,
+                                   base_seed=base_seed)
+    return tournament.play_games(start, stop)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import os
 from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from typing import List, Optional
@@ -20,34 +21,44 @@ class TournamentStats:
     avg_moves_to_10000: Optional[float]
     median_moves_to_10000: Optional[float]
 
+def _play_single_game(args) -> GameStats:
+    """Play a single game in a worker process.
+
+    Lives at module level so only the (game_id, rows, cols, target, seed) tuple
+    is pickled per game, not the whole TournamentManager.
+    """
+    game_id, rows, cols, target, seed = args
+    game = GameManager(rows=rows, cols=cols, target=target, rng=np.random.default_rng(seed))
+    stats = game.play_game()
+    stats.game_id = game_id
+    return stats
+
 class TournamentManager:
-    def __init__(self, num_games: int = 100, target: int = 10000, rows: int = 11, cols: int = 11):
+    def __init__(self, num_games: int = 100, target: int = 10000, rows: int = 11, cols: int = 11,
+                 base_seed: Optional[int] = None):
         self.num_games = num_games
         self.target = target
         self.rows = rows
         self.cols = cols
+        # Spawns one seed per game; base_seed=None seeds it from OS entropy
+        self.seed_sequence = np.random.SeedSequence(base_seed)
+        # Drawn once, as spawn advances the sequence; reruns replay the same games
+        self.game_seeds = self.seed_sequence.spawn(num_games)
         
-    def _play_single_game(self, game_id: int) -> GameStats:
-        """Play a single game in a separate process."""
-        game = GameManager(rows=self.rows, cols=self.cols, target=self.target)
-        stats = game.play_game()
-        stats.game_id = game_id
-        return stats
-    
     def run_tournament(self) -> TournamentStats:
         """Run tournament using parallel processing."""
-        # Use process pool for parallel execution
-        with ProcessPoolExecutor() as executor:
-            # Submit all games to the pool
-            futures = [
-                executor.submit(self._play_single_game, game_id)
-                for game_id in range(self.num_games)
-            ]
-            
-            # Collect results as they complete
-            game_stats = []
-            for future in futures:
-                game_stats.append(future.result())
+        workers = os.cpu_count() or 1
+        # A game's seed depends only on base_seed and game_id, never on the chunking
+        games = [(game_id, self.rows, self.cols, self.target, self.game_seeds[game_id])
+                 for game_id in range(self.num_games)]
+        
+        # Hand games to the pool in chunks so dispatch overhead is shared
+        # across several games; map keeps the results in game order
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            game_stats = list(executor.map(
+                _play_single_game, games,
+                chunksize=max(1, self.num_games // (4 * workers))
+            ))
         
         # Calculate tournament statistics
         points = [stats.points for stats in game_stats]
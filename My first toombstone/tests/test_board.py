@@ -1,6 +1,20 @@
 import unittest
 import numpy as np
-from src.board import Board, Color, Formation
+from src.board import Board, Color, Formation, _nibble_run
+
+def plain_run(line, pos):
+    """(start, length) of the run through line[pos], found by walking the line; length 0 if empty."""
+    if line[pos] == Color.EMPTY:
+        return pos, 0
+    start, end = pos, pos + 1
+    while start > 0 and line[start - 1] == line[pos]:
+        start -= 1
+    while end < len(line) and line[end] == line[pos]:
+        end += 1
+    return start, end - start
+
+def pack(line):
+    return sum(int(value) << (4 * i) for i, value in enumerate(line))
 
 class TestBoard(unittest.TestCase):
     def setUp(self):
@@ -30,6 +44,20 @@ class TestBoard(unittest.TestCase):
         for formation in horizontal_3s:
             self.assertEqual(formation.score, 5)
     
+    def test_line_formation_scores(self):
+        line_board = np.zeros((11, 11), dtype=np.int8)
+        line_board[0, 0:5] = 1  # Horizontal line of 5
+        line_board[3:7, 10] = 2  # Vertical line of 4
+        board = Board(predefined=line_board)
+        
+        formations = board.find_line_formations()
+        self.assertEqual(len(formations), 2)
+        # Cells are flat row * cols + col indices
+        np.testing.assert_array_equal(formations[0].cells, [0, 1, 2, 3, 4])
+        self.assertEqual(formations[0].score, 50)
+        np.testing.assert_array_equal(formations[1].cells, [43, 54, 65, 76])
+        self.assertEqual(formations[1].score, 10)
+    
     def test_l_formations(self):
         # Create a board with an L pattern
         l_pattern = np.zeros((11, 11), dtype=np.int8)
@@ -61,6 +89,16 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(len(formations), 1)
         self.assertEqual(formations[0].score, 30)
     
+    def test_remove_formations_writes_through(self):
+        # Also when the grid has been replaced by a non-C-contiguous array
+        for grid in (self.board.grid, np.asfortranarray(self.board.grid)):
+            board = Board(predefined=self.test_board)
+            board.grid = grid.copy(order='A')
+            formations = board.find_all_formations()
+            self.assertGreater(board.remove_formations(formations), 0)
+            for formation in formations:
+                self.assertTrue((board.grid.flat[formation.cells] == Color.EMPTY).all())
+    
     def test_gravity(self):
         # Create a board with gaps
         test_board = np.ones((11, 11), dtype=np.int8)
@@ -72,6 +110,63 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(board.get_color(0, 5), Color.EMPTY)
         self.assertEqual(board.get_color(5, 5), Color.RED)
     
+    def test_seeded_board_is_reproducible(self):
+        a = Board(rng=np.random.default_rng(7))
+        b = Board(rng=np.random.default_rng(7))
+        np.testing.assert_array_equal(a.grid, b.grid)
+        
+        a.grid[0:3, 0] = Color.EMPTY
+        b.grid[0:3, 0] = Color.EMPTY
+        a.refill_board()
+        b.refill_board()
+        np.testing.assert_array_equal(a.grid, b.grid)
+    
+    def test_nibble_run_matches_plain_walk(self):
+        lines = [
+            [1, 1, 1, 2, 0, 0, 3, 3, 3],  # Runs at both ends around empty cells
+            [0, 4, 4, 4, 4, 4, 4, 4, 0],
+            [2] * 16,  # Longest packed line
+        ]
+        rng = np.random.default_rng(0)
+        lines += [rng.integers(0, 5, size=rng.integers(1, 17)).tolist() for _ in range(200)]
+        for line in lines:
+            ones = int('1' * len(line), 16)
+            for pos in range(len(line)):
+                self.assertEqual(_nibble_run(pack(line), pos, ones, len(line)), plain_run(line, pos),
+                                 (line, pos))
+    
+    def test_packed_bits_follow_grid_changes(self):
+        board = Board(rng=np.random.default_rng(3))
+        rng = np.random.default_rng(4)
+        
+        def assert_in_sync():
+            # The run checks repack stale lines before reading them
+            for row in range(board.rows):
+                for col in range(board.cols):
+                    self.assertEqual(board._run_horizontal(row, col), plain_run(board.grid[row], col))
+                    self.assertEqual(board._run_vertical(row, col), plain_run(board.grid[:, col], row))
+            self.assertEqual(board._row_bits, [pack(row) for row in board.grid])
+            self.assertEqual(board._col_bits, [pack(col) for col in board.grid.T])
+        
+        assert_in_sync()
+        for _ in range(50):
+            row, col = rng.integers(0, 10, size=2).tolist()
+            board._swap_cells(row, col, row, col + 1)
+            assert_in_sync()
+            board._swap_cells(row, col, row + 1, col)
+            assert_in_sync()
+            formations = board.find_all_formations()
+            board.remove_formations(formations)
+            assert_in_sync()
+            # A cascade step only marks the packed lines stale; they are
+            # repacked once, by the next run check
+            board.remove_formations(board.find_all_formations())
+            board.apply_gravity()
+            board.refill_board()
+            self.assertTrue(board._bits_stale)
+            assert_in_sync()
+            self.assertFalse(board._bits_stale)
+    
     def test_valid_swap(self):
         # Create a board where a swap would create a formation
         test_board = np.ones((11, 11), dtype=np.int8)
@@ -82,5 +177,76 @@ class TestBoard(unittest.TestCase):
         result = board.try_swap(5, 5, 5, 4)
         self.assertTrue(result)
 
+    def small_board(self):
+        # Empty 6x6 board with one swap away from an L (colour 1) and a T (colour 2)
+        grid = np.zeros((6, 6), dtype=np.int8)
+        grid[0:2, 0] = 1  # L stem, missing its corner at (2, 0)
+        grid[2, 1:3] = 1  # L foot
+        grid[3, 0] = 1  # Swapping up fills the corner
+        grid[2:4, 4] = 2  # T stem, missing its centre at (4, 4)
+        grid[4, 3] = 2  # T crossbar
+        grid[4, 5] = 2
+        grid[5, 4] = 2  # Swapping up fills the centre
+        return Board(6, 6, predefined=grid)
+    
+    def test_try_swap_rejects_invalid_swaps(self):
+        board = self.small_board()
+        before = board.grid.copy()
+        self.assertFalse(board.try_swap(0, 4, 0, 5))  # Creates nothing
+        self.assertFalse(board.try_swap(0, 5, 0, 6))  # Off the board
+        self.assertFalse(board.try_swap(0, 0, -1, 0))
+        self.assertFalse(board.try_swap(3, 0, 2, 1))  # Diagonal
+        self.assertFalse(board.try_swap(3, 0, 1, 0))  # Not adjacent
+        np.testing.assert_array_equal(board.grid, before)
+    
+    def test_find_possible_moves(self):
+        board = self.small_board()
+        # Every swap that puts a swapped cell in a formation, by brute force on a copy
+        expected = []
+        for row in range(6):
+            for col in range(6):
+                for row2, col2 in ((row, col + 1), (row + 1, col)):
+                    if row2 == 6 or col2 == 6:
+                        continue
+                    swapped = Board(6, 6, predefined=board.grid)
+                    swapped.grid[[row, row2], [col, col2]] = swapped.grid[[row2, row], [col2, col]]
+                    formations = (swapped.find_line_formations() + swapped.find_l_formations()
+                                  + swapped.find_t_formations())
+                    if any({row * 6 + col, row2 * 6 + col2} & set(f.cells.tolist()) for f in formations):
+                        expected.append((row, col, row2, col2))
+        moves = board.find_possible_moves()
+        self.assertEqual(moves, expected)
+        self.assertIn((2, 0, 3, 0), moves)
+        self.assertIn((4, 4, 5, 4), moves)
+        
+        # Those two moves complete the L and the T, which outscore their lines
+        for move, score in (((2, 0, 3, 0), 20), ((4, 4, 5, 4), 30)):
+            swapped = self.small_board()
+            self.assertTrue(swapped.try_swap(*move))
+            self.assertEqual([f.score for f in swapped.find_all_formations()], [score])
+
+    def test_local_score_for_swap(self):
+        def score(cells, move):
+            grid = np.zeros((6, 6), dtype=np.int8)
+            for (row, col), color in cells.items():
+                grid[row, col] = color
+            board = Board(6, 6, predefined=grid)
+            result = board.local_score_for_swap(*move)
+            np.testing.assert_array_equal(board.grid, grid)  # The swap is reverted
+            return result
+        
+        # (1, 2) moves up into a row of 1s
+        self.assertEqual(score({(0, 0): 1, (0, 1): 1, (1, 2): 1}, (0, 2, 1, 2)), 5)
+        self.assertEqual(score({(0, 0): 1, (0, 1): 1, (0, 3): 1, (1, 2): 1}, (0, 2, 1, 2)), 10)
+        self.assertEqual(score({(0, 0): 1, (0, 1): 1, (0, 3): 1, (0, 4): 1, (1, 2): 1}, (0, 2, 1, 2)), 50)
+        # Both swapped cells complete a line
+        self.assertEqual(score({(0, 0): 1, (0, 1): 1, (0, 2): 2, (0, 3): 1,
+                                (0, 4): 2, (0, 5): 2}, (0, 2, 0, 3)), 10)
+        # A row of 4 crossing a column of 3 at the swapped cell
+        self.assertEqual(score({(2, 0): 1, (2, 1): 1, (2, 3): 1, (0, 2): 1, (1, 2): 1,
+                                (3, 2): 1}, (2, 2, 3, 2)), 15)
+        # Filling an L corner scores its two 3-lines
+        self.assertEqual(score({(0, 0): 1, (1, 0): 1, (2, 1): 1, (2, 2): 1, (3, 0): 1}, (2, 0, 3, 0)), 10)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,142 @@
+import unittest
+import numpy as np
+from src.board_optimized import Board, Color
+from src.board_numba import _detect_all, _detect_all_11
+
+def cells(mask):
+    return set(map(tuple, np.argwhere(mask).tolist()))
+
+class TestOptimizedBoard(unittest.TestCase):
+    def setUp(self):
+        # Neighbouring cells always differ, so the board starts without formations
+        rows, cols = np.indices((11, 11))
+        self.test_board = ((rows + 2 * cols) % 6 + 1).astype(np.int8)
+
+    def test_no_formations(self):
+        board = Board(predefined_board=self.test_board)
+        self.assertFalse(board.find_all_formations().any())
+
+    def test_predefined_grid_is_c_contiguous(self):
+        self.test_board[2, 3:7] = 2
+        board = Board(predefined_board=self.test_board.T)
+        self.assertTrue(board.grid.flags.c_contiguous)
+        self.assertEqual(cells(board.find_vertical_lines()), {(3, 2), (4, 2), (5, 2), (6, 2)})
+    
+    def test_line_formations(self):
+        self.test_board[2, 3:7] = 2  # Horizontal line of 4
+        self.test_board[6:9, 10] = 4  # Vertical line of 3
+        board = Board(predefined_board=self.test_board)
+
+        self.assertEqual(cells(board.find_horizontal_lines()), {(2, 3), (2, 4), (2, 5), (2, 6)})
+        self.assertEqual(cells(board.find_vertical_lines()), {(6, 10), (7, 10), (8, 10)})
+
+    def test_l_shape(self):
+        self.test_board[4, 4:7] = 2
+        self.test_board[5, 4] = 2
+        board = Board(predefined_board=self.test_board)
+
+        self.assertEqual(cells(board.find_l_shapes()), {(4, 4), (4, 5), (4, 6), (5, 4)})
+
+    def test_detection_follows_grid_changes(self):
+        self.test_board[2, 3:6] = 2
+        board = Board(predefined_board=self.test_board)
+
+        formations = board.find_all_formations()
+        self.assertGreaterEqual(formations.sum(), 3)
+        points, dirty_cols = board.remove_formations(formations)
+        self.assertEqual(points, 100 * formations.sum())
+        np.testing.assert_array_equal(dirty_cols, formations.any(axis=0))
+        self.assertFalse(board.find_all_formations().any())
+
+    def test_column_limited_detection_matches_full(self):
+        # Cascades of random boards, each step clearing every formation first
+        for seed in range(50):
+            board = Board(rng=np.random.default_rng(seed))
+            moves = board.find_possible_moves()
+            if not moves:
+                continue
+            formations = board.try_swap(*moves[0])
+            while formations.any():
+                _, dirty_cols = board.remove_formations(formations)
+                board.apply_gravity()
+                board.refill_board()
+                formations = np.empty_like(formations)
+                board.find_all_formations_fused(formations, dirty_cols)
+                np.testing.assert_array_equal(formations, board.find_all_formations())
+
+    def test_possible_moves_match_full_detection(self):
+        # The windowed check must find exactly the swaps a full-board detection finds
+        for shape in ((11, 11), (7, 12)):
+            rows, cols = shape
+            pairs = ([(r, c, r, c + 1) for r in range(rows) for c in range(cols - 1)]
+                     + [(r, c, r + 1, c) for r in range(rows - 1) for c in range(cols)])
+            for seed in range(10):
+                board = Board(*shape, rng=np.random.default_rng(seed))
+                expected = []
+                for r1, c1, r2, c2 in pairs:
+                    grid = board.grid.copy()
+                    grid[r1, c1], grid[r2, c2] = grid[r2, c2], grid[r1, c1]
+                    if Board(*shape, predefined_board=grid).find_all_formations().any():
+                        expected.append((r1, c1, r2, c2))
+                self.assertTrue(expected)
+                self.assertEqual(board.find_possible_moves(), expected)
+
+    def test_gravity(self):
+        # Candies fall in their own column and keep their order; empties rise to the top
+        grid = np.array([
+            [1, 0, 4, 2],
+            [0, 0, 5, 3],
+            [2, 0, 6, 4],
+            [0, 0, 1, 5],
+            [3, 0, 0, 6],
+        ], dtype=np.int8)
+        board = Board(5, 4, predefined_board=grid)
+        board.apply_gravity()
+
+        np.testing.assert_array_equal(board.grid, [
+            [0, 0, 0, 2],
+            [0, 0, 4, 3],
+            [1, 0, 5, 4],
+            [2, 0, 6, 5],
+            [3, 0, 1, 6],
+        ])
+        self.assertTrue(board.grid.flags.c_contiguous)
+
+    def test_refill_only_fills_empty_cells(self):
+        board = Board(rng=np.random.default_rng(2))
+        holes = np.zeros((11, 11), dtype=bool)
+        holes[0, :] = True
+        holes[3:6, 4] = True
+        holes[10, 10] = True
+        before = board.grid.copy()
+        board.grid[holes] = Color.EMPTY
+        board.refill_board()
+
+        np.testing.assert_array_equal(board.grid[~holes], before[~holes])
+        self.assertTrue(((board.grid[holes] >= 1) & (board.grid[holes] <= 6)).all())
+
+    def test_fused_detection_matches_find_all_formations(self):
+        rng = np.random.default_rng(1)
+        for shape in ((11, 11), (8, 9)):
+            for _ in range(50):
+                grid = rng.integers(1, 4, size=shape).astype(np.int8)
+                board = Board(*shape, predefined_board=grid)
+                fused = np.ones(shape, dtype=bool)
+                board.find_all_formations_fused(fused)
+                np.testing.assert_array_equal(fused, board.find_all_formations())
+
+    def test_fixed_size_kernel_matches_generic(self):
+        # The 11x11 kernel hard-codes the standard L patterns
+        board = Board(predefined_board=self.test_board)
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            grid = rng.integers(0, 4, size=(11, 11)).astype(np.int8)
+            generic = [np.zeros((11, 11), dtype=bool) for _ in range(3)]
+            fixed = [np.zeros((11, 11), dtype=bool) for _ in range(3)]
+            _detect_all(grid, board.l_offsets_h, board.l_offsets_v, *generic)
+            _detect_all_11(grid, *fixed)
+            for expected, actual in zip(generic, fixed):
+                np.testing.assert_array_equal(actual, expected)
+
+if __name__ == '__main__':
+    unittest.main()
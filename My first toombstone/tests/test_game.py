@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+from src.game import GameManager, _EARLY_ACCEPT_SCORE
+
+def filler():
+    # Diagonal stripes of colours 1-3: no formations and no possible moves
+    rows, cols = np.indices((11, 11))
+    return ((rows + cols) % 3 + 1).astype(np.int8)
+
+class TestGame(unittest.TestCase):
+    def test_find_best_move_accepts_first_strong_move(self):
+        grid = filler()
+        grid[1, [0, 1, 3, 4]] = 4  # (0, 2) swaps down into a line of 5
+        grid[0, 2] = 4
+        grid[8, [0, 1, 3, 4]] = 4  # (9, 2) swaps up into a line of 5 crossing a column of 3
+        grid[9, 2] = 4
+        grid[6:8, 2] = 4
+        game = GameManager(predefined_board=grid)
+        
+        self.assertEqual(game.board.local_score_for_swap(0, 2, 1, 2), _EARLY_ACCEPT_SCORE)
+        self.assertGreater(game.board.local_score_for_swap(8, 2, 9, 2), _EARLY_ACCEPT_SCORE)
+        self.assertEqual(game.find_best_move(), (0, 2, 1, 2))
+    
+    def test_find_best_move_below_threshold_takes_best(self):
+        grid = filler()
+        grid[1, [0, 1]] = 4  # Line of 3, found first
+        grid[0, 2] = 4
+        grid[8, [0, 1, 3]] = 4  # Line of 4
+        grid[9, 2] = 4
+        game = GameManager(predefined_board=grid)
+        
+        self.assertEqual(game.board.find_possible_moves()[0], (0, 2, 1, 2))
+        self.assertEqual(game.find_best_move(), (8, 2, 9, 2))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import unittest
+import numpy as np
+from src.board_optimized import Color
+from src.game_optimized import GameManager, _EARLY_ACCEPT_SCORE, _is_gapped_pair
+
+def filler():
+    # Diagonal stripes of colours 1-3: no formations and no possible moves
+    rows, cols = np.indices((11, 11))
+    return ((rows + cols) % 3 + 1).astype(np.int8)
+
+def unique_gapped_pair(window):
+    # The np.unique check _is_gapped_pair replaced
+    values, counts = np.unique(window, return_counts=True)
+    return bool(len(values) == 2 and Color.EMPTY in values and counts[values != Color.EMPTY][0] == 2)
+
+class TestOptimizedGame(unittest.TestCase):
+    def test_gapped_pair_matches_unique_check(self):
+        windows = [
+            ([4, 0, 4], True),  # Gapped pairs
+            ([0, 4, 4], True),
+            ([5, 5, 0, 0, 0], True),
+            ([4, 0, 5], False),  # Two colours
+            ([4, 4, 4], False),  # All equal
+            ([3, 3, 3, 0, 3], False),
+            ([0, 0, 0], False),  # EMPTY only
+            ([0, 6, 0, 0], False),
+            ([4, 5, 6], False),  # Three distinct
+            ([4, 5, 0, 4], False),
+        ]
+        rng = np.random.default_rng(0)
+        windows += [(rng.integers(0, 3, size=rng.integers(3, 6)).tolist(), None) for _ in range(200)]
+        for values, expected in windows:
+            window = np.array(values, dtype=np.int8)
+            if expected is not None:
+                self.assertEqual(_is_gapped_pair(window), expected, values)
+            self.assertEqual(_is_gapped_pair(window), unique_gapped_pair(window), values)
+    
+    def test_seeded_game_is_reproducible(self):
+        games = [GameManager(target=3000, rng=np.random.default_rng(5)) for _ in range(2)]
+        np.testing.assert_array_equal(games[0].board.grid, games[1].board.grid)
+        self.assertEqual(games[0].play_game(), games[1].play_game())
+    
+    def test_swap_mask_seeds_cascade(self):
+        # Reusing try_swap's mask must match detecting the swapped board afresh
+        for seed in range(10):
+            games = [GameManager(rng=np.random.default_rng(seed)) for _ in range(2)]
+            move = games[0].board.find_possible_moves()[0]
+            formations = games[0].board.try_swap(*move)
+            self.assertIsNotNone(formations)
+            self.assertIsNotNone(games[1].board.try_swap(*move))
+            
+            self.assertEqual(games[0].process_formations(initial=formations), games[1].process_formations())
+            np.testing.assert_array_equal(games[0].board.grid, games[1].board.grid)
+            self.assertEqual(games[0].total_cascades, games[1].total_cascades)
+    
+    def test_find_best_move_accepts_first_strong_move(self):
+        grid = filler()
+        grid[[0, 1, 3, 4], 2] = 4  # (2, 3) swaps left into a column of 5, the first move found
+        grid[2, 3] = 4
+        grid[8, [0, 1, 3, 4]] = 5  # (9, 2) swaps up into a row of 5 crossing a column of 3
+        grid[9, 2] = 5
+        grid[6:8, 2] = 5
+        game = GameManager(predefined_board=grid)
+        
+        self.assertEqual(game.board.find_possible_moves()[0], (2, 2, 2, 3))
+        self.assertEqual(game.board.local_score_for_swap(2, 2, 2, 3), _EARLY_ACCEPT_SCORE)
+        self.assertGreater(game.board.local_score_for_swap(8, 2, 9, 2), _EARLY_ACCEPT_SCORE)
+        self.assertEqual(game.find_best_move(), (2, 2, 2, 3))
+    
+    def test_find_best_move_below_threshold_takes_best(self):
+        grid = filler()
+        grid[[0, 1], 2] = 4  # Column of 3, found first
+        grid[2, 3] = 4
+        grid[8, [0, 1, 3]] = 5  # (7, 2) swaps down into a row of 4
+        grid[7, 2] = 5
+        game = GameManager(predefined_board=grid)
+        
+        self.assertEqual(game.board.find_possible_moves()[0], (2, 2, 2, 3))
+        self.assertEqual(game.find_best_move(), (7, 2, 8, 2))
+    
+    def test_repeated_move_is_penalised(self):
+        grid = filler()
+        grid[[0, 1], 2] = 4  # Two column-of-3 moves with equal scores
+        grid[2, 3] = 4
+        grid[[6, 7], 8] = 5
+        grid[8, 9] = 5
+        game = GameManager(predefined_board=grid)
+        
+        # Ties go to the first move found, which is then recorded as played
+        self.assertEqual(game.find_best_move(), (2, 2, 2, 3))
+        self.assertEqual(game.move_history[2, 2, 2, 3], 1)
+        self.assertEqual(int(game.move_history.sum()), 1)
+        # Picking it again scores it down, so the other move wins
+        self.assertEqual(game.find_best_move(), (8, 8, 8, 9))
+        self.assertEqual(game.move_history[8, 8, 8, 9], 1)
+        
+        self.assertTrue(game.make_move(2, 2, 2, 3))
+        self.assertEqual(game.move_history[2, 2, 2, 3], 2)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
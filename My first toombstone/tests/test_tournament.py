@@ -0,0 +1,28 @@
+import unittest
+from src.tournament import TournamentManager
+
+class TestTournament(unittest.TestCase):
+    def play(self, workers):
+        tournament = TournamentManager(num_games=5, target=300, workers=workers, base_seed=11)
+        tournament.run_tournament()
+        return tournament.stats
+    
+    def test_sharding_keeps_results(self):
+        # Same base_seed, same stats in the same game order for any number of workers
+        serial = self.play(1)
+        self.assertEqual([s.game_id for s in serial], list(range(5)))
+        self.assertEqual(self.play(2), serial)
+    
+    def test_play_games_range_matches_full_run(self):
+        tournament = TournamentManager(num_games=5, target=300, base_seed=11)
+        self.assertEqual(tournament.play_games(2, 4), self.play(1)[2:4])
+    
+    def test_rerun_repeats_games(self):
+        tournament = TournamentManager(num_games=3, target=300, base_seed=11)
+        self.assertEqual(tournament.play_games(1, 3), tournament.play_games(1, 3))
+        tournament.run_tournament()
+        tournament.run_tournament()
+        self.assertEqual(tournament.stats[3:], tournament.stats[:3])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
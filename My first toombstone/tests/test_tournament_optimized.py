@@ -0,0 +1,15 @@
+import unittest
+from src.tournament_optimized import TournamentManager
+
+class TestOptimizedTournament(unittest.TestCase):
+    def test_seeded_tournament_is_reproducible(self):
+        runs = [TournamentManager(num_games=4, target=2000, base_seed=3).run_tournament() for _ in range(2)]
+        self.assertEqual([s.game_id for s in runs[0].games], list(range(4)))
+        self.assertEqual(runs[0], runs[1])
+    
+    def test_rerun_repeats_games(self):
+        tournament = TournamentManager(num_games=3, target=2000)
+        self.assertEqual(tournament.run_tournament(), tournament.run_tournament())
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file